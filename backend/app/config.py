@@ -1,5 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
+from datetime import time
+from typing import Literal
 
 class Settings(BaseSettings):
     DATABASE_URL: str
@@ -12,6 +14,94 @@ class Settings(BaseSettings):
     jwt_algorithm: str
     jwt_expire_minutes: int
 
+    # SQLAlchemy compiled-statement cache / asyncpg prepared-statement cache per connection
+    DB_QUERY_CACHE_SIZE: int = 1200
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 500
+
+    # Auto-close of stale "In Progress" tasks
+    AUTO_CLOSE_ENABLED: bool = False
+    AUTO_CLOSE_POLICY: Literal["end_of_day", "max_duration"] = "end_of_day"
+    AUTO_CLOSE_END_OF_DAY: time = time(19, 0)
+    AUTO_CLOSE_MAX_HOURS: float = 12
+    AUTO_CLOSE_INTERVAL_SECONDS: int = 300
+    AUTO_CLOSE_BATCH_SIZE: int = 500
+
+    # Delta sync
+    SYNC_OVERLAP_SECONDS: int = 5
+    SYNC_TOMBSTONE_RETENTION_DAYS: int = 30
+
+    # Live active-timer feed (SSE)
+    LIVE_FEED_HEARTBEAT_SECONDS: int = 15
+    LIVE_FEED_QUEUE_SIZE: int = 100
+
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_COMPRESS_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    # Per-request profiling
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_SECONDS: float = 0.001
+    PROFILE_DIR: str = "profiles"
+    PROFILE_MAX_FILES: int = 200
+
+    # Bulk timesheet import
+    IMPORT_CHUNK_SIZE: int = 10000
+    IMPORT_USE_COPY: bool = True
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+
+    # Columnar (Parquet / Arrow IPC) export
+    EXPORT_BATCH_SIZE: int = 5000
+
+    # Idempotency-Key replay cache
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    # How long a running request holds its key; a worker that dies mid-request
+    # frees it for retries after this.
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+
+    # Task audit log
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 2
+    AUDIT_MAX_PENDING: int = 500
+
+    # Working-hours calendar defaults for departments without their own row
+    DEFAULT_WORKDAY_MINUTES: int = 480
+    DEFAULT_WEEKMASK: str = "1111100"
+
+    # Reviewer auto-assignment: full reload of team membership and open-review counts
+    REVIEWER_RESYNC_INTERVAL_SECONDS: int = 300
+
+    # total_time_minutes verification / repair job
+    DURATION_CHECK_INTERVAL_SECONDS: int = 24 * 60 * 60
+    DURATION_CHECK_BATCH_SIZE: int = 5000
+    DURATION_CHECK_AUTO_REPAIR: bool = True
+    DURATION_CHECK_MAX_REPORTED_IDS: int = 100
+
+    # Shared cache invalidation across workers: "postgres" (LISTEN/NOTIFY),
+    # "sqlite" (polled file, for tests / single host) or "none" (one process)
+    CACHE_BUS_BACKEND: str = "postgres"
+    CACHE_BUS_CHANNEL: str = "cache_invalidation"
+    CACHE_BUS_SQLITE_PATH: str = "cache_bus.sqlite3"
+    CACHE_BUS_POLL_SECONDS: float = 0.05
+    USER_CACHE_TTL_SECONDS: int = 300
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Multi-tenancy: logins that name no organisation use the default tenant;
+    # budgets apply per tenant unless overridden on the row
+    DEFAULT_TENANT_SLUG: str = "default"
+    DEFAULT_TENANT_NAME: str = "Default"
+    TENANT_MAX_CONCURRENT_SESSIONS: int = 5
+    TENANT_REQUESTS_PER_MINUTE: int = 1200
+    TENANT_SESSION_ACQUIRE_TIMEOUT_SECONDS: float = 5
+
+    # Dashboard cube (department x week x task type minutes)
+    CUBE_REFRESH_INTERVAL_SECONDS: int = 60
+    CUBE_FULL_REBUILD_HOURS: int = 24
+    CUBE_SNAPSHOT_PATH: str = "dashboard_cube.npz"
+
+    # Weekly manager digest (UTC); weekday 0 = Monday
+    DIGEST_WEEKDAY: int = 0
+    DIGEST_TIME: time = time(9, 0)
+
     model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
@@ -1,13 +1,14 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.database import AsyncSessionLocal
-from app.models import User
+from app.models import User, RoleEnum
 
 from app.config import settings
+from app.services.user_service import user_cache
+from app.utils.tenancy import tenant_from_request, tenant_session
 
 SECRET_KEY = settings.jwt_secret_key
 ALGORITHM = settings.jwt_algorithm
@@ -16,8 +17,8 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.jwt_expire_minutes
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-async def get_async_db() -> AsyncSession:
-    async with AsyncSessionLocal() as session:
+async def get_async_db(request: Request) -> AsyncSession:
+    async with tenant_session(tenant_from_request(request)) as session:
         yield session
 
 
@@ -36,9 +37,30 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     except JWTError:
         raise credentials_exception
 
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user or not user.is_active:
+    # Cached as plain column values; each request gets its own detached User.
+    values = user_cache.get(user_id)
+    if values is None:
+        version = user_cache.version()
+        result = await db.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if user:
+            user_cache.set(user_id, {c.key: getattr(user, c.key) for c in User.__mapper__.column_attrs if c.key != "password"}, version)
+    else:
+        user = User(**values)
+    # The session is already scoped to the token's tenant; this also covers cache hits.
+    if not user or not user.is_active or user.tenant_id != db.info.get("tenant_id"):
         raise credentials_exception
 
     return user
+
+
+async def require_admin(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != RoleEnum.Admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return current_user
+
+
+async def require_management(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role not in (RoleEnum.Admin, RoleEnum.Management):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Management access required")
+    return current_user
@@ -1,6 +1,20 @@
 from fastapi import FastAPI
 from .database import Base, engine
-from .routers import users, projects, tasks, auth
+from .models import SCHEMA_UPGRADE_DDL, TASK_DURATION_DDL, tenant_upgrade_ddl
+from .routers import users, projects, tasks, auth, admin, calendar, dashboard
+from .config import settings
+from .services import auto_close_service, task_service, digest_service
+from .services.live_feed_service import live_feed
+from .services.audit_service import audit_log
+from .services.reviewer_service import reviewer_balancer
+from .services.project_search_service import project_index
+from .services.dashboard_service import dashboard_cube
+from .utils.scheduler import scheduler, PeriodicJob
+from .utils.cache import invalidation_bus
+from .utils.idempotency import idempotency_store
+from .utils.tenancy import ensure_default_tenant
+from .utils.compression import CompressionMiddleware
+from .utils.profiler import ProfilerMiddleware, install_sql_timing
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 
@@ -19,11 +33,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESS_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
+app.add_middleware(
+    ProfilerMiddleware,
+    sample_rate=settings.PROFILE_SAMPLE_RATE,
+    interval=settings.PROFILE_INTERVAL_SECONDS,
+)
+install_sql_timing(engine)
+
 # Prefix all routers with "/api"
 app.include_router(users.router, prefix="/api")
 app.include_router(projects.router, prefix="/api")
 app.include_router(tasks.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(calendar.router, prefix="/api")
+app.include_router(dashboard.router, prefix="/api")
 
 @app.get("/")
 def root():
@@ -33,6 +64,43 @@ def root():
 async def on_startup():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+    # Logins that name no organisation use this tenant, and rows from before
+    # multi-tenancy are assigned to it.
+    default_tenant_id = await ensure_default_tenant()
+    async with engine.begin() as conn:
+        for ddl in SCHEMA_UPGRADE_DDL + tenant_upgrade_ddl(default_tenant_id) + TASK_DURATION_DDL:
+            await conn.execute(ddl)
+
+    await invalidation_bus.start()
+    await live_feed.load()
+    await project_index.load()
+    scheduler.add(PeriodicJob("live_feed_heartbeat", live_feed.heartbeat, settings.LIVE_FEED_HEARTBEAT_SECONDS))
+
+    # Hierarchy edits trigger a resync through the invalidation bus and other
+    # workers' task writes arrive there as load deltas; the periodic resync
+    # corrects drift from lost messages or writes made outside the app.
+    await reviewer_balancer.resync()
+    scheduler.add(PeriodicJob("reviewer_resync", reviewer_balancer.resync, settings.REVIEWER_RESYNC_INTERVAL_SECONDS))
+
+    if settings.AUTO_CLOSE_ENABLED:
+        scheduler.add(PeriodicJob("auto_close", auto_close_service.close_stale_tasks, settings.AUTO_CLOSE_INTERVAL_SECONDS))
+    scheduler.add(PeriodicJob("audit_flush", audit_log.flush, settings.AUDIT_FLUSH_INTERVAL_SECONDS))
+    scheduler.add(PeriodicJob("manager_digest", digest_service.run_scheduled_digest, digest_service.seconds_until_next_digest))
+    scheduler.add(PeriodicJob("verify_task_durations", task_service.run_scheduled_duration_check, settings.DURATION_CHECK_INTERVAL_SECONDS))
+    scheduler.add(PeriodicJob("prune_task_tombstones", task_service.prune_task_tombstones, 24 * 60 * 60))
+    scheduler.add(PeriodicJob("prune_idempotency_keys", idempotency_store.prune, 60 * 60))
+
+    # Starts from the on-disk snapshot when there is a recent one.
+    await dashboard_cube.load()
+    scheduler.add(PeriodicJob("dashboard_cube_refresh", dashboard_cube.refresh, settings.CUBE_REFRESH_INTERVAL_SECONDS))
+    scheduler.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await scheduler.stop()
+    await invalidation_bus.stop()
+    # Persist audit entries buffered since the last scheduled flush.
+    await audit_log.flush()
 
 @app.get('/robots.txt',include_in_schema=False)
 def robots():
@@ -1,6 +1,7 @@
-from app.utils.timestamp import TimestampMixin
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Date, Time, Enum, Text, DateTime, Float
-from sqlalchemy.orm import relationship
+from app.utils.timestamp import TimestampMixin, utc_now
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, Date, Time, Enum, Text, DateTime, Float, Index, JSON, DDL, FetchedValue, UniqueConstraint
+from sqlalchemy.orm import relationship, declared_attr
+from sqlalchemy.schema import CreateIndex
 from .database import Base
 import enum
 from datetime import datetime, timezone
@@ -18,34 +19,71 @@ class DepartmentEnum(str, enum.Enum):
     IT = "IT - SOFTWARE"
     GRAPHICS = "GRAPHICS"
 
-class User(Base, TimestampMixin):
+class NotificationPreferenceEnum(str, enum.Enum):
+    immediate = "immediate"
+    digest = "digest"
+
+class Tenant(Base, TimestampMixin):
+    """A client organisation; every other table is scoped to one."""
+    __tablename__ = "tenants"
+
+    id = Column(Integer, primary_key=True, index=True)
+    slug = Column(String(50), unique=True, nullable=False)
+    name = Column(String(100), nullable=False)
+    is_active = Column(Boolean, default=True, nullable=False)
+    # Per-tenant budget overrides; NULL falls back to the TENANT_* settings.
+    max_concurrent_sessions = Column(Integer, nullable=True)
+    requests_per_minute = Column(Integer, nullable=True)
+
+
+class TenantMixin:
+    """Adds tenant_id; app.utils.tenancy filters and fills it in automatically."""
+
+    @declared_attr
+    def tenant_id(cls):
+        return Column(Integer, ForeignKey("tenants.id"), nullable=False, index=True)
+
+
+class User(Base, TimestampMixin, TenantMixin):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
-    employee_code = Column(Integer, unique=True, nullable=False, index=True)
+    employee_code = Column(Integer, nullable=False, index=True)
     name = Column(String(50), nullable=False)
-    username = Column(String(50), unique=True, nullable=False)
-    email = Column(String, unique=True, index=True)
+    username = Column(String(50), nullable=False)
+    email = Column(String, index=True)
     password = Column(String(150), nullable=False)
     department = Column(Enum(DepartmentEnum), nullable=False)
     reporting_manager = Column(Integer, ForeignKey('users.id'), nullable=True)
     tl = Column(Integer, ForeignKey('users.id'), nullable=True)
     role = Column(Enum(RoleEnum), nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
+    timezone = Column(String(64), default="UTC", nullable=False)
+    notification_preference = Column(Enum(NotificationPreferenceEnum), default=NotificationPreferenceEnum.immediate, nullable=False)
 
     reporting_manager_user = relationship("User", remote_side=[id], foreign_keys=[reporting_manager], post_update=True)
     tl_user = relationship("User", remote_side=[id], foreign_keys=[tl], post_update=True)
 
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "employee_code", name="uq_users_tenant_employee_code"),
+        UniqueConstraint("tenant_id", "username", name="uq_users_tenant_username"),
+        UniqueConstraint("tenant_id", "email", name="uq_users_tenant_email"),
+    )
 
-class Project(Base, TimestampMixin):
+
+class Project(Base, TimestampMixin, TenantMixin):
     __tablename__ = "projects"
 
     id = Column(Integer, primary_key=True, index=True)
-    project_code = Column(String(50), unique=True, nullable=True)
+    project_code = Column(String(50), nullable=True)
     project_name = Column(String(50), nullable=False)
     project_description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True, nullable=False)
 
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "project_code", name="uq_projects_tenant_project_code"),
+    )
+
 
 class TaskTypeEnum(str, enum.Enum):
     Development = "Development"
@@ -66,7 +104,7 @@ class TaskStatusEnum(str, enum.Enum):
 def today_utc():
     return datetime.now(timezone.utc).date()
 
-class Task(Base, TimestampMixin):
+class Task(Base, TimestampMixin, TenantMixin):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -77,7 +115,9 @@ class Task(Base, TimestampMixin):
     task_details = Column(String(256), nullable=True)
     start_time = Column(DateTime(timezone=True), nullable=False)
     end_time = Column(DateTime(timezone=True), nullable=True)
-    total_time_minutes = Column(Float, nullable=True)
+    # Maintained by the tasks_total_time_minutes trigger (TASK_DURATION_DDL);
+    # FetchedValue makes the ORM reload it after every insert/update.
+    total_time_minutes = Column(Float, nullable=True, server_default=FetchedValue(), server_onupdate=FetchedValue())
     task_type = Column(Enum(TaskTypeEnum), nullable=False)
     reviewer_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     status = Column(Enum(TaskStatusEnum), nullable=True)
@@ -90,3 +130,214 @@ class Task(Base, TimestampMixin):
     creator = relationship("User", foreign_keys=[created_by])
     project = relationship("Project", foreign_keys=[project_id])
 
+    __table_args__ = (
+        # Delta sync: "tasks of these users changed since <watermark>"
+        Index("ix_tasks_tenant_user_updated_at", "tenant_id", "user_id", "updated_at"),
+        # Per-user time totals over a date range are answered from the index alone
+        Index("ix_tasks_tenant_user_date_total", "tenant_id", "user_id", "date", postgresql_include=["total_time_minutes"]),
+        # Unscoped (Admin / Management) task lists, newest first
+        Index("ix_tasks_tenant_start_time", "tenant_id", "start_time"),
+        # Dashboard cube refresh: "which tasks changed since <watermark>" across tenants
+        Index("ix_tasks_updated_at", "updated_at"),
+    )
+
+
+# Idempotent; run at startup so existing databases get the trigger too.
+TASK_DURATION_DDL = [
+    DDL("""
+CREATE OR REPLACE FUNCTION tasks_set_total_time_minutes() RETURNS trigger AS $$
+BEGIN
+    IF NEW.start_time IS NOT NULL AND NEW.end_time IS NOT NULL THEN
+        NEW.total_time_minutes := round((extract(epoch FROM NEW.end_time - NEW.start_time) / 60)::numeric, 2);
+    ELSE
+        NEW.total_time_minutes := NULL;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""),
+    DDL("DROP TRIGGER IF EXISTS tasks_total_time_minutes ON tasks"),
+    DDL("""
+CREATE TRIGGER tasks_total_time_minutes
+BEFORE INSERT OR UPDATE ON tasks
+FOR EACH ROW EXECUTE FUNCTION tasks_set_total_time_minutes()
+"""),
+]
+
+
+class TaskTombstone(Base, TenantMixin):
+    """Marker left behind by a hard delete so delta-sync clients can drop the row."""
+    __tablename__ = "task_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, nullable=False)
+    # No foreign key: the user may be deleted while the tombstone is kept.
+    user_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+    # The deleted task's date, so the dashboard cube knows which week to recompute
+    date = Column(Date, nullable=True)
+
+    __table_args__ = (
+        Index("ix_task_tombstones_tenant_user_deleted_at", "tenant_id", "user_id", "deleted_at"),
+    )
+
+
+class TaskAuditLog(Base, TenantMixin):
+    """Append-only history of task changes as {field: [old, new]} diffs."""
+    __tablename__ = "task_audit_logs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, nullable=False)
+    # Plain ids, no foreign keys: history outlives deleted users, and the
+    # buffered writes must not fail because a user was deleted before a flush.
+    user_id = Column(Integer, nullable=False)
+    actor_id = Column(Integer, nullable=True)
+    action = Column(String(20), nullable=False)
+    changes = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+    __table_args__ = (
+        Index("ix_task_audit_logs_tenant_task_created_at", "tenant_id", "task_id", "created_at"),
+        Index("ix_task_audit_logs_created_at", "created_at"),
+    )
+
+
+class Holiday(Base, TimestampMixin, TenantMixin):
+    __tablename__ = "holidays"
+
+    id = Column(Integer, primary_key=True, index=True)
+    date = Column(Date, nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "date", name="uq_holidays_tenant_date"),
+    )
+
+
+class DepartmentWorkingHours(Base, TimestampMixin, TenantMixin):
+    __tablename__ = "department_working_hours"
+
+    id = Column(Integer, primary_key=True, index=True)
+    department = Column(Enum(DepartmentEnum), nullable=False)
+    minutes_per_day = Column(Integer, nullable=False, default=480)
+    # Mon..Sun, "1" = working day (numpy busday weekmask format)
+    weekmask = Column(String(7), nullable=False, default="1111100")
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "department", name="uq_department_working_hours_tenant_department"),
+    )
+
+
+class ScheduledRun(Base):
+    """Last claimed slot per scheduled job, so a job runs once across workers."""
+    __tablename__ = "scheduled_runs"
+
+    name = Column(String(64), primary_key=True)
+    slot = Column(DateTime(timezone=True), nullable=False)
+    claimed_at = Column(DateTime(timezone=True), default=utc_now, nullable=False)
+
+
+class IdempotencyKey(Base):
+    """The outcome of a request sent with an Idempotency-Key, shared by all workers.
+
+    A row with no status_code is a request still running; until expires_at
+    (a short lease while running, the replay TTL once finished) no other
+    request may claim the key.
+    """
+    __tablename__ = "idempotency_keys"
+
+    id = Column(Integer, primary_key=True)
+    tenant_id = Column(Integer, ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False)
+    endpoint = Column(String(64), nullable=False)
+    key = Column(String(255), nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    body = Column(Text, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "endpoint", "key", name="uq_idempotency_keys_tenant_endpoint_key"),
+    )
+
+
+# create_all only creates missing tables, so columns added to existing ones
+# are patched in here. Idempotent; run at startup before TASK_DURATION_DDL.
+SCHEMA_UPGRADE_DDL = [
+    DDL("ALTER TABLE users ADD COLUMN IF NOT EXISTS timezone VARCHAR(64) NOT NULL DEFAULT 'UTC'"),
+    DDL(
+        "DO $$ BEGIN CREATE TYPE notificationpreferenceenum AS ENUM ('immediate', 'digest'); "
+        "EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+    ),
+    DDL(
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS notification_preference "
+        "notificationpreferenceenum NOT NULL DEFAULT 'immediate'"
+    ),
+    DDL("ALTER TABLE task_tombstones ADD COLUMN IF NOT EXISTS date DATE"),
+    DDL("ALTER TABLE task_tombstones DROP CONSTRAINT IF EXISTS task_tombstones_user_id_fkey"),
+    DDL("ALTER TABLE task_audit_logs DROP CONSTRAINT IF EXISTS task_audit_logs_user_id_fkey"),
+    DDL("ALTER TABLE task_audit_logs DROP CONSTRAINT IF EXISTS task_audit_logs_actor_id_fkey"),
+]
+
+# Single-tenant uniques and indexes that the tenant-scoped ones above replace.
+_PRE_TENANT_CONSTRAINTS = [
+    ("users", "users_username_key"),
+    ("projects", "projects_project_code_key"),
+    ("department_working_hours", "department_working_hours_department_key"),
+]
+# Same names as the current plain indexes, but unique; only dropped if so.
+_PRE_TENANT_UNIQUE_INDEXES = ["ix_users_employee_code", "ix_users_email", "ix_holidays_date"]
+_PRE_TENANT_INDEXES = [
+    "ix_tasks_user_id_updated_at",
+    "ix_tasks_user_id_date_total",
+    "ix_task_tombstones_user_id_deleted_at",
+    "ix_task_audit_logs_task_id_created_at",
+]
+
+
+def tenant_upgrade_ddl(default_tenant_id: int) -> list:
+    """Moves databases from before multi-tenancy onto tenant-scoped tables.
+
+    Existing rows are assigned to `default_tenant_id`. Idempotent and cheap
+    once applied; run at startup after SCHEMA_UPGRADE_DDL.
+    """
+    ddl = []
+    tables = [t for t in Base.metadata.sorted_tables if "tenant_id" in t.c]
+    for table in tables:
+        ddl.append(DDL(f"""
+DO $$ BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = '{table.name}'
+          AND column_name = 'tenant_id' AND is_nullable = 'NO'
+    ) THEN
+        ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS tenant_id INTEGER REFERENCES tenants (id);
+        UPDATE {table.name} SET tenant_id = {int(default_tenant_id)} WHERE tenant_id IS NULL;
+        ALTER TABLE {table.name} ALTER COLUMN tenant_id SET NOT NULL;
+    END IF;
+END $$"""))
+    for table_name, constraint in _PRE_TENANT_CONSTRAINTS:
+        ddl.append(DDL(f"ALTER TABLE {table_name} DROP CONSTRAINT IF EXISTS {constraint}"))
+    for index in _PRE_TENANT_UNIQUE_INDEXES:
+        ddl.append(DDL(f"""
+DO $$ BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = '{index}' AND i.indisunique
+    ) THEN
+        DROP INDEX {index};
+    END IF;
+END $$"""))
+    for index in _PRE_TENANT_INDEXES:
+        ddl.append(DDL(f"DROP INDEX IF EXISTS {index}"))
+    for table in tables:
+        for constraint in table.constraints:
+            if isinstance(constraint, UniqueConstraint) and constraint.name:
+                columns = ", ".join(c.name for c in constraint.columns)
+                ddl.append(DDL(f"""
+DO $$ BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = '{constraint.name}') THEN
+        ALTER TABLE {table.name} ADD CONSTRAINT {constraint.name} UNIQUE ({columns});
+    END IF;
+END $$"""))
+        ddl.extend(CreateIndex(index, if_not_exists=True) for index in table.indexes)
+    return ddl
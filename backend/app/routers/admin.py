@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List
+
+from app import schemas
+from app.dependencies import require_admin
+from app.models import User
+from app.services import auto_close_service, digest_service, task_service
+from app.utils.profiler import profile_store
+
+# Admin is a role within one tenant: everything below is limited to the
+# admin's own tenant.
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/auto-close/metrics", response_model=schemas.AutoCloseMetrics)
+async def auto_close_metrics(admin: User = Depends(require_admin)):
+    return auto_close_service.tenant_metrics(admin.tenant_id)
+
+
+@router.post("/auto-close/run", response_model=schemas.AutoCloseMetrics)
+async def run_auto_close(admin: User = Depends(require_admin)):
+    await auto_close_service.close_stale_tasks(tenant_id=admin.tenant_id)
+    return auto_close_service.tenant_metrics(admin.tenant_id)
+
+
+@router.post("/task-durations/verify", response_model=schemas.DurationCheckResult)
+async def verify_task_durations(
+    repair: bool = False,
+    batch_size: int = Query(None, ge=1, le=100000),
+    admin: User = Depends(require_admin),
+):
+    return await task_service.verify_task_durations(repair, batch_size, tenant_id=admin.tenant_id)
+
+
+@router.post("/digest/run")
+async def run_manager_digest(admin: User = Depends(require_admin)):
+    return {"sent": await digest_service.send_manager_digests(tenant_id=admin.tenant_id)}
+
+
+@router.get("/profiles", response_model=List[schemas.ProfileSummary])
+async def slowest_profiles(limit: int = Query(20, ge=1, le=200), admin: User = Depends(require_admin)):
+    return profile_store.slowest(limit, admin.tenant_id)
+
+
+@router.get("/profiles/{profile_id}", response_model=schemas.ProfileDetail)
+async def get_profile(profile_id: str, admin: User = Depends(require_admin)):
+    profile = profile_store.get(profile_id, admin.tenant_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, HTTPException
 from sqlalchemy.future import select
 from datetime import timedelta
+from app.config import settings
+from app.database import AsyncSessionLocal
 from app.models import User
 from app.schemas import LoginRequest, TokenResponse
 from app.utils.auth import verify_password, create_access_token
-from app.dependencies import get_async_db
+from app.utils.tenancy import get_tenant_by_slug, tenant_session
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 @router.post("/login", response_model=TokenResponse)
-async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
-    result = await db.execute(select(User).where(User.username == request.username))
-    user = result.scalar_one_or_none()
+async def login(request: LoginRequest):
+    # There is no token yet, so the organisation comes from the request body.
+    async with AsyncSessionLocal() as db:
+        tenant = await get_tenant_by_slug(request.tenant or settings.DEFAULT_TENANT_SLUG, db)
+
+    async with tenant_session(tenant.id) as db:
+        result = await db.execute(select(User).where(User.username == request.username))
+        user = result.scalar_one_or_none()
 
     if not user or not verify_password(request.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid username or password")
@@ -29,6 +35,7 @@ async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db))
             "id": user.id,
             "name": user.name,
             "username": user.username,
-            "role": user.role.value
+            "role": user.role.value,
+            "tenant_id": user.tenant_id,
         }
     }
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import date
+
+from app import schemas
+from app.dependencies import get_async_db, get_current_user, require_admin
+from app.models import User, DepartmentEnum
+from app.services import calendar_service
+
+
+router = APIRouter(prefix="/calendar", tags=["Calendar"])
+
+
+@router.get("/holidays", response_model=List[schemas.HolidayOut])
+async def list_holidays(
+    year: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await calendar_service.list_holidays(db, year)
+
+
+@router.post("/holidays", response_model=schemas.HolidayOut)
+async def create_holiday(
+    holiday: schemas.HolidayCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin),
+):
+    return await calendar_service.create_holiday(holiday, db)
+
+
+@router.delete("/holidays/{holiday_id}")
+async def delete_holiday(
+    holiday_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin),
+):
+    return await calendar_service.delete_holiday(holiday_id, db)
+
+
+@router.get("/working-hours", response_model=List[schemas.WorkingHoursOut])
+async def list_working_hours(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await calendar_service.list_working_hours(db)
+
+
+@router.put("/working-hours/{department}", response_model=schemas.WorkingHoursOut)
+async def set_working_hours(
+    department: DepartmentEnum,
+    hours: schemas.WorkingHoursUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin),
+):
+    return await calendar_service.set_working_hours(department, hours, db)
+
+
+@router.get("/hours-report", response_model=schemas.HoursReportOut)
+async def hours_report(
+    from_date: date,
+    to_date: date,
+    department: Optional[DepartmentEnum] = None,
+    only_under_logged: bool = Query(False, description="Only users who logged less than expected"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await calendar_service.hours_report(from_date, to_date, db, current_user, department, only_under_logged)
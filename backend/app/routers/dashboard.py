@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import date
+
+from app import schemas
+from app.dependencies import get_async_db, require_management
+from app.models import User, DepartmentEnum
+from app.services import dashboard_service
+
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+@router.get("/heatmap", response_model=schemas.DashboardHeatmapOut)
+async def heatmap(
+    from_date: date,
+    to_date: date,
+    department: Optional[DepartmentEnum] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_management),
+):
+    return dashboard_service.get_heatmap(db, from_date, to_date, department)
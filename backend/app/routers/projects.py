@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from app import schemas
 from app.dependencies import get_async_db
 from app.services import project_service
@@ -12,8 +14,22 @@ async def create(project: schemas.ProjectCreate, db: AsyncSession = Depends(get_
     return await project_service.create_project(project, db)
 
 @router.get("/", response_model=List[schemas.ProjectOut])
-async def get_all(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
-    return await project_service.get_all_projects(skip, limit, db)
+async def get_all(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Comma-separated project fields to return"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    projects = await project_service.get_all_projects(skip, limit, db, fields)
+    return JSONResponse(jsonable_encoder(projects)) if fields else projects
+
+@router.get("/search", response_model=List[schemas.ProjectSearchResult])
+async def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return project_service.search_projects(q, limit, db)
 
 @router.get("/{project_id}", response_model=schemas.ProjectOut)
 async def get_by_id(project_id: int, db: AsyncSession = Depends(get_async_db)):
@@ -1,26 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form, Header
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Literal
 from datetime import datetime, date, timezone
 
 from app import schemas
-from app.dependencies import get_async_db, get_current_user
+from app.dependencies import get_async_db, get_current_user, require_admin
 from app.models import User, RoleEnum, TaskStatusEnum
-from app.services import task_service
-from fastapi.responses import StreamingResponse
+from app.services import task_service, import_service, export_service
+from app.services.live_feed_service import live_feed
+from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
+from app.utils.idempotency import run_idempotent
+from app.utils.tenancy import session_tenant_id
 
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 
 @router.post("/create", response_model=schemas.TaskOut)
-async def create_task(task: schemas.TaskCreate, db: AsyncSession = Depends(get_async_db)):
-    return await task_service.create_task(task, db)
+async def create_task(
+    task: schemas.TaskCreate,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    async def run():
+        return schemas.TaskOut.model_validate(await task_service.create_task(task, db))
+    return await run_idempotent(idempotency_key, session_tenant_id(db), "create", task.model_dump_json(), run)
+
+
+@router.post("/import", response_model=schemas.TaskImportResult)
+async def import_tasks(
+    file: UploadFile = File(...),
+    timezone: str = Form("UTC"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(require_admin),
+):
+    return await import_service.import_tasks(file, timezone, db, current_user)
 
 
 @router.put("/{task_id}/complete", response_model=schemas.TaskOut)
-async def complete_task(task_id: int, end_time: Optional[datetime] = None, db: AsyncSession = Depends(get_async_db)):
-    return await task_service.complete_task(task_id, end_time, db)
+async def complete_task(
+    task_id: int,
+    end_time: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    async def run():
+        return schemas.TaskOut.model_validate(await task_service.complete_task(task_id, end_time, db))
+    return await run_idempotent(idempotency_key, session_tenant_id(db), f"complete:{task_id}", str(end_time), run)
 
 
 @router.post("/", response_model=List[schemas.TaskOut])
@@ -31,13 +58,46 @@ async def list_tasks(
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1),
     search: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return"),
+):
+    tasks = await task_service.list_tasks(filters, db, current_user, page, page_size, search, fields)
+    return JSONResponse(jsonable_encoder(tasks)) if fields else tasks
+
+
+@router.get("/changes", response_model=schemas.TaskChangesOut)
+async def task_changes(
+    since: Optional[datetime] = None,
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+):
+    return await task_service.get_task_changes(since, db, current_user, limit, cursor)
+
+
+@router.get("/live")
+async def live_active_timers(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
 ):
-    return await task_service.list_tasks(filters, db, current_user, page, page_size, search)
+    user_ids = await task_service.visible_user_ids(db, current_user)
+    subscription = live_feed.subscribe(current_user.tenant_id, user_ids)
+    return StreamingResponse(
+        live_feed.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.put("/{task_id}/approve", response_model=schemas.TaskOut)
-async def approve_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
-    return await task_service.approve_task(task_id, db)
+async def approve_task(
+    task_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    async def run():
+        return schemas.TaskOut.model_validate(await task_service.approve_task(task_id, db))
+    return await run_idempotent(idempotency_key, session_tenant_id(db), f"approve:{task_id}", "", run)
 
 
 @router.put("/{task_id}/edit", response_model=schemas.TaskOut)
@@ -50,6 +110,11 @@ async def edit_task(
     return await task_service.edit_task(task_id, updated_data, db, current_user)
 
 
+@router.get("/{task_id}/history", response_model=List[schemas.TaskAuditOut])
+async def task_history(task_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    return await task_service.get_task_history(task_id, db, current_user)
+
+
 @router.delete("/{task_id}")
 async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
     return await task_service.delete_task(task_id, db, current_user)
@@ -61,5 +126,8 @@ async def download_task_report(
     db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
     search: Optional[str] = None,
+    export_format: Literal["xlsx", "parquet", "arrow"] = Query("xlsx", alias="format"),
 ):
+    if export_format != "xlsx":
+        return await export_service.export_task_report(filters, db, current_user, search, export_format)
     return await task_service.download_task_report(filters, db, current_user, search)
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app import schemas, models
@@ -16,9 +18,11 @@ async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_a
 async def get_users(
     role: Optional[schemas.RoleEnum] = None,
     active: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated user fields to return"),
     db: AsyncSession = Depends(get_async_db),
 ):
-    return await user_service.get_users(db, role, active)
+    users = await user_service.get_users(db, role, active, fields)
+    return JSONResponse(jsonable_encoder(users)) if fields else users
 
 @router.get("/get-users", response_model=List[schemas.SimpleUser])
 async def get_filtered_users(
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, Literal
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import Optional, Literal, List, Dict, Any
 from datetime import date, datetime
 from enum import Enum
 from app.models import TaskTypeEnum, TaskStatusEnum
@@ -9,6 +9,8 @@ from app.models import TaskTypeEnum, TaskStatusEnum
 class LoginRequest(BaseModel):
     username: str
     password: str
+    # Organisation slug; omitted means the default organisation
+    tenant: Optional[str] = None
 
 
 class TokenResponse(BaseModel):
@@ -33,6 +35,11 @@ class DepartmentEnum(str, Enum):
     GRAPHICS = "GRAPHICS"
 
 
+class NotificationPreferenceEnum(str, Enum):
+    immediate = "immediate"
+    digest = "digest"
+
+
 # User Schemas
 class UserBase(BaseModel):
     name: str
@@ -44,6 +51,8 @@ class UserBase(BaseModel):
     role: RoleEnum
     is_active: bool = True
     employee_code: Optional[str] = None
+    timezone: str = "UTC"
+    notification_preference: NotificationPreferenceEnum = NotificationPreferenceEnum.immediate
 
 
 class UserCreate(UserBase):
@@ -58,6 +67,8 @@ class UserUpdate(BaseModel):
     role: Optional[RoleEnum]
     is_active: Optional[bool]
     password: Optional[str]
+    timezone: Optional[str] = None
+    notification_preference: Optional[NotificationPreferenceEnum] = None
 
 
 class UserOut(UserBase):
@@ -103,6 +114,11 @@ class ProjectOut(ProjectBase):
     class Config:
         from_attributes = True
 
+class ProjectSearchResult(BaseModel):
+    id: int
+    project_code: Optional[str] = None
+    project_name: str
+
 
 # Task Schemas
 class TaskBase(BaseModel):
@@ -121,7 +137,8 @@ class TaskBase(BaseModel):
     status: Optional[TaskStatusEnum] = None
 
 class TaskCreate(TaskBase):
-    pass
+    # Pick the least-loaded reviewer in the user's team when reviewer_id is not given
+    auto_assign_reviewer: bool = False
 
 class TaskUpdate(BaseModel):
     start_time: Optional[datetime] = None
@@ -133,6 +150,7 @@ class TaskUpdate(BaseModel):
     task_type: Optional[TaskTypeEnum] = None
     project_id: Optional[int] = None
     user_id: Optional[int] = None
+    auto_assign_reviewer: bool = False
 
 class TaskOut(TaskBase):
     id: int
@@ -146,6 +164,36 @@ class TaskOut(TaskBase):
     class Config:
         from_attributes = True
 
+class TaskChangesOut(BaseModel):
+    tasks: List[TaskOut]
+    deleted_ids: List[int]
+    watermark: datetime
+    has_more: bool = False
+    next_cursor: Optional[str] = None
+    full_resync: bool = False
+
+class TaskImportRowError(BaseModel):
+    row: int
+    errors: List[str]
+
+class TaskImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[TaskImportRowError]
+
+class TaskAuditOut(BaseModel):
+    # None for entries not yet flushed from the write buffer
+    id: Optional[int] = None
+    task_id: int
+    user_id: int
+    actor_id: Optional[int] = None
+    action: str
+    changes: Dict[str, List[Any]]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
 class TaskFilterRequest(BaseModel):
     user_id: Optional[int] = None
     project_id: Optional[int] = None
@@ -158,3 +206,100 @@ class TaskFilterRequest(BaseModel):
 
     only_backdated: Optional[bool] = False
     filter_backdated_by_creator_type: Optional[Literal["own", "manager", "all"]] = "all"
+
+
+# Auto-close Schemas
+class AutoCloseMetrics(BaseModel):
+    runs: int = 0
+    batches: int = 0
+    tasks_closed: int = 0
+    last_run_at: Optional[datetime] = None
+    last_run_closed: int = 0
+    last_run_duration_ms: float = 0.0
+    last_error: Optional[str] = None
+
+
+class DurationCheckResult(BaseModel):
+    scanned: int
+    mismatched: int
+    repaired: int
+    sample_ids: List[int]
+
+
+# Profiling Schemas
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    query: str = ""
+    status_code: int
+    started_at: datetime
+    duration_ms: float
+    sql_ms: float
+    sql_count: int
+    python_ms: float
+    services: Dict[str, float] = {}
+
+
+class ProfileDetail(ProfileSummary):
+    report: str
+
+
+# Calendar Schemas
+class HolidayCreate(BaseModel):
+    date: date
+    name: str
+
+
+class HolidayOut(HolidayCreate):
+    id: int
+
+    class Config:
+        from_attributes = True
+
+
+class WorkingHoursBase(BaseModel):
+    minutes_per_day: int = Field(480, ge=0, le=24 * 60)
+    weekmask: str = Field("1111100", pattern="^[01]{7}$")
+
+
+class WorkingHoursUpdate(WorkingHoursBase):
+    @field_validator("weekmask")
+    @classmethod
+    def has_working_day(cls, value: str) -> str:
+        # numpy rejects a mask without working days, which would break every hours report.
+        if "1" not in value:
+            raise ValueError("weekmask must include at least one working day")
+        return value
+
+
+class WorkingHoursOut(WorkingHoursBase):
+    department: DepartmentEnum
+
+    class Config:
+        from_attributes = True
+
+
+class UserHoursOut(BaseModel):
+    user_id: int
+    name: str
+    department: DepartmentEnum
+    expected_minutes: float
+    logged_minutes: float
+    difference_minutes: float
+
+
+class HoursReportOut(BaseModel):
+    from_date: date
+    to_date: date
+    users: List[UserHoursOut]
+
+
+class DashboardHeatmapOut(BaseModel):
+    weeks: List[date]
+    departments: List[DepartmentEnum]
+    task_types: List[TaskTypeEnum]
+    # minutes[department][week][task type], in the order of the lists above
+    minutes: List[List[List[float]]]
+    built_at: Optional[datetime]
+    refreshed_at: Optional[datetime]
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Task, TaskAuditLog
+from app.utils.timestamp import utc_now
+
+logger = logging.getLogger(__name__)
+
+AUDITED_FIELDS = [c.name for c in Task.__table__.columns if c.name not in ("id", "tenant_id", "created_at", "updated_at")]
+
+
+def snapshot(task: Task) -> dict:
+    return {field: getattr(task, field) for field in AUDITED_FIELDS}
+
+
+def diff(before: Optional[dict], after: Optional[dict]) -> dict:
+    """{field: [old, new]} for every field that changed; None means "no row"."""
+    before = before or {}
+    after = after or {}
+    return {
+        field: [before.get(field), after.get(field)]
+        for field in AUDITED_FIELDS
+        if before.get(field) != after.get(field)
+    }
+
+
+class AuditLogBuffer:
+    """Collects task audit entries in memory and writes them in batches.
+
+    Service functions only append to a list; a scheduler job (and shutdown)
+    flushes with one multi-row INSERT, so auditing adds no round trip to the
+    request path. Entries written since the last flush are lost only if the
+    process dies without a graceful shutdown.
+
+    A batch rejected by a constraint is retried row by row and the offending
+    rows are dropped, so one bad entry cannot wedge the buffer.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._in_flight: List[dict] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def record(self, tenant_id: int, task_id: int, user_id: int, actor_id: Optional[int], action: str, changes: dict):
+        if not changes:
+            return
+        self._pending.append({
+            # Flushed through an unscoped session, so set explicitly.
+            "tenant_id": tenant_id,
+            "task_id": task_id,
+            "user_id": user_id,
+            "actor_id": actor_id,
+            "action": action,
+            # Encode now so later mutations of the ORM object cannot leak in.
+            "changes": jsonable_encoder(changes),
+            "created_at": utc_now(),
+        })
+        if len(self._pending) >= self.max_pending and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def pending(self, tenant_id: int, task_id: int) -> List[TaskAuditLog]:
+        """This process's unwritten entries for a task, as transient rows without an id."""
+        return [
+            TaskAuditLog(**entry)
+            for entry in self._in_flight + self._pending
+            if entry["tenant_id"] == tenant_id and entry["task_id"] == task_id
+        ]
+
+    async def flush(self) -> int:
+        async with self._lock:
+            if not self._pending:
+                return 0
+            batch, self._pending = self._pending, []
+            self._in_flight = batch
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(TaskAuditLog), batch)
+                    await db.commit()
+                return len(batch)
+            except IntegrityError:
+                return await self._insert_each(batch)
+            except Exception:
+                # Keep the entries for the next attempt, ahead of newer ones.
+                self._pending[:0] = batch
+                logger.exception("Failed to flush %d task audit entries", len(batch))
+                raise
+            finally:
+                self._in_flight = []
+
+    async def _insert_each(self, batch: List[dict]) -> int:
+        written = 0
+        async with AsyncSessionLocal() as db:
+            for entry in batch:
+                try:
+                    async with db.begin_nested():
+                        await db.execute(insert(TaskAuditLog), [entry])
+                    written += 1
+                except IntegrityError:
+                    logger.exception("Dropping task audit entry that violates a constraint: %r", entry)
+            await db.commit()
+        return written
+
+
+audit_log = AuditLogBuffer(settings.AUDIT_MAX_PENDING)
@@ -0,0 +1,139 @@
+import logging
+import time as time_module
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from sqlalchemy import select, update, func, case, DateTime
+
+from app import schemas
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Task, User, TaskStatusEnum
+from app.services.live_feed_service import live_feed
+from app.services.audit_service import audit_log
+
+logger = logging.getLogger(__name__)
+
+metrics = schemas.AutoCloseMetrics()
+# Closed-task counts split by tenant, so tenant admins only see their own.
+tasks_closed_by_tenant: Dict[int, int] = {}
+last_run_closed_by_tenant: Dict[int, int] = {}
+
+
+class EndOfWorkdayPolicy:
+    """Close at the configured cutoff on the (user-local) day the task started.
+
+    Tasks started after the cutoff are closed at local midnight instead, so an
+    evening task is never closed with a negative or zero duration.
+    """
+
+    def __init__(self, cutoff):
+        self.cutoff = timedelta(hours=cutoff.hour, minutes=cutoff.minute, seconds=cutoff.second)
+
+    def end_time(self):
+        local_start = func.timezone(User.timezone, Task.start_time, type_=DateTime)
+        local_day = func.date_trunc("day", local_start, type_=DateTime)
+        local_cutoff = local_day + self.cutoff
+        local_end = case(
+            (local_start < local_cutoff, local_cutoff),
+            else_=local_day + timedelta(days=1),
+        )
+        return func.timezone(User.timezone, local_end, type_=DateTime(timezone=True))
+
+
+class MaxDurationPolicy:
+    """Close any task that has been running for longer than `hours`."""
+
+    def __init__(self, hours: float):
+        self.duration = timedelta(hours=hours)
+
+    def end_time(self):
+        return Task.start_time + self.duration
+
+
+def get_policy():
+    if settings.AUTO_CLOSE_POLICY == "max_duration":
+        return MaxDurationPolicy(settings.AUTO_CLOSE_MAX_HOURS)
+    return EndOfWorkdayPolicy(settings.AUTO_CLOSE_END_OF_DAY)
+
+
+def _close_batch_stmt(policy, batch_size: int, tenant_id: Optional[int] = None):
+    end_time = policy.end_time()
+    stale = [Task.status == TaskStatusEnum.InProgress, end_time <= func.now()]
+    if tenant_id is not None:
+        stale.append(Task.tenant_id == tenant_id)
+
+    # Lock a bounded slice of stale rows; SKIP LOCKED lets user requests and
+    # other workers proceed instead of queueing behind the job.
+    batch_ids = (
+        select(Task.id)
+        .join(User, User.id == Task.user_id)
+        .where(*stale)
+        .order_by(Task.id)
+        .limit(batch_size)
+        .with_for_update(of=Task, skip_locked=True)
+        .correlate(None)
+    )
+
+    return (
+        update(Task)
+        .where(Task.id.in_(batch_ids), User.id == Task.user_id)
+        .values(end_time=end_time, status=TaskStatusEnum.Done)
+        .returning(Task.id, Task.tenant_id, Task.user_id, Task.end_time, Task.total_time_minutes)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def close_stale_tasks(policy=None, batch_size: int = None, tenant_id: Optional[int] = None) -> int:
+    """Close stale tasks of every tenant, or only of `tenant_id`."""
+    policy = policy or get_policy()
+    batch_size = batch_size or settings.AUTO_CLOSE_BATCH_SIZE
+    stmt = _close_batch_stmt(policy, batch_size, tenant_id)
+
+    started = time_module.perf_counter()
+    metrics.last_run_at = datetime.now(timezone.utc)
+    closed = 0
+    last_run_closed_by_tenant.clear()
+    try:
+        while True:
+            # One short transaction per batch keeps row locks brief.
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(stmt)
+                rows = result.all()
+                await db.commit()
+
+            if not rows:
+                break
+            for task_id, task_tenant_id, user_id, end_time, total_minutes in rows:
+                live_feed.remove_task(task_id)
+                tasks_closed_by_tenant[task_tenant_id] = tasks_closed_by_tenant.get(task_tenant_id, 0) + 1
+                last_run_closed_by_tenant[task_tenant_id] = last_run_closed_by_tenant.get(task_tenant_id, 0) + 1
+                audit_log.record(task_tenant_id, task_id, user_id, None, "auto_close", {
+                    "status": [TaskStatusEnum.InProgress, TaskStatusEnum.Done],
+                    "end_time": [None, end_time],
+                    "total_time_minutes": [None, total_minutes],
+                })
+            closed += len(rows)
+            metrics.batches += 1
+            if len(rows) < batch_size:
+                break
+        metrics.last_error = None
+    except Exception as exc:
+        metrics.last_error = repr(exc)
+        raise
+    finally:
+        metrics.runs += 1
+        metrics.tasks_closed += closed
+        metrics.last_run_closed = closed
+        metrics.last_run_duration_ms = round((time_module.perf_counter() - started) * 1000, 2)
+
+    if closed:
+        logger.info("Auto-closed %d stale in-progress tasks", closed)
+    return closed
+
+
+def tenant_metrics(tenant_id: int) -> schemas.AutoCloseMetrics:
+    """Job metrics with the closed counts narrowed to one tenant."""
+    return metrics.model_copy(update={
+        "tasks_closed": tasks_closed_by_tenant.get(tenant_id, 0),
+        "last_run_closed": last_run_closed_by_tenant.get(tenant_id, 0),
+    })
@@ -0,0 +1,310 @@
+import asyncio
+import logging
+import os
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import select, func, cast, tuple_, Date
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Task, TaskTombstone, TaskAuditLog, User, DepartmentEnum, TaskTypeEnum
+from app.utils.cache import ALL, invalidation_bus
+from app.utils.scheduler import claim_run
+from app.utils.tenancy import session_tenant_id
+
+logger = logging.getLogger(__name__)
+
+DEPARTMENTS = list(DepartmentEnum)
+TASK_TYPES = list(TaskTypeEnum)
+DEPARTMENT_INDEX = {d: i for i, d in enumerate(DEPARTMENTS)}
+TASK_TYPE_INDEX = {t: i for i, t in enumerate(TASK_TYPES)}
+
+# Longest range one heatmap request may cover.
+MAX_HEATMAP_WEEKS = 260
+
+# Extra weeks allocated whenever a cube grows, so appends are amortised.
+GROWTH_WEEKS = 26
+
+
+def _week(column):
+    # Postgres weeks start on Monday, matching _monday() below.
+    return cast(func.date_trunc("week", column), Date)
+
+
+def _monday(d: date) -> date:
+    return d - timedelta(days=d.weekday())
+
+
+_task_week = _week(Task.date)
+
+CUBE_QUERY = (
+    select(Task.tenant_id, User.department, _task_week, Task.task_type, func.sum(Task.total_time_minutes))
+    .join(User, User.id == Task.user_id)
+    .where(Task.total_time_minutes.isnot(None))
+    .group_by(Task.tenant_id, User.department, _task_week, Task.task_type)
+)
+
+_old_date = cast(TaskAuditLog.changes[("date", 0)].as_string(), Date)
+
+
+class TenantCube:
+    """Logged minutes for one tenant as a dense (department, week, task type) array."""
+
+    __slots__ = ("origin", "minutes")
+
+    def __init__(self, origin: date, minutes: Optional[np.ndarray] = None):
+        self.origin = origin
+        self.minutes = minutes if minutes is not None else np.zeros((len(DEPARTMENTS), 0, len(TASK_TYPES)))
+
+    def _index(self, week: date) -> int:
+        return (week - self.origin).days // 7
+
+    def _ensure(self, first: date, last: date):
+        lo, hi = self._index(first), self._index(last)
+        if lo < 0:
+            pad = -lo + GROWTH_WEEKS
+            self.minutes = np.concatenate([np.zeros((len(DEPARTMENTS), pad, len(TASK_TYPES))), self.minutes], axis=1)
+            self.origin -= timedelta(weeks=pad)
+            hi += pad
+        if hi >= self.minutes.shape[1]:
+            pad = hi - self.minutes.shape[1] + 1 + GROWTH_WEEKS
+            self.minutes = np.concatenate([self.minutes, np.zeros((len(DEPARTMENTS), pad, len(TASK_TYPES)))], axis=1)
+
+    def clear_weeks(self, weeks: Iterable[date]):
+        idx = [i for i in map(self._index, weeks) if 0 <= i < self.minutes.shape[1]]
+        self.minutes[:, idx, :] = 0
+
+    def add(self, rows):
+        """rows: (department, week, task type, minutes) aggregates."""
+        if not rows:
+            return
+        self._ensure(min(r[1] for r in rows), max(r[1] for r in rows))
+        d = np.fromiter((DEPARTMENT_INDEX[r[0]] for r in rows), dtype=np.intp, count=len(rows))
+        w = np.fromiter((self._index(r[1]) for r in rows), dtype=np.intp, count=len(rows))
+        t = np.fromiter((TASK_TYPE_INDEX[r[2]] for r in rows), dtype=np.intp, count=len(rows))
+        np.add.at(self.minutes, (d, w, t), np.fromiter((r[3] for r in rows), dtype=np.float64, count=len(rows)))
+
+    def window(self, first: date, last: date) -> np.ndarray:
+        """Minutes for weeks first..last (Mondays, inclusive); zero where not covered."""
+        count = self._index(last) - self._index(first) + 1
+        out = np.zeros((len(DEPARTMENTS), count, len(TASK_TYPES)))
+        lo, hi = self._index(first), self._index(last) + 1
+        src_lo, src_hi = max(lo, 0), min(hi, self.minutes.shape[1])
+        if src_lo < src_hi:
+            out[:, src_lo - lo:src_hi - lo, :] = self.minutes[:, src_lo:src_hi, :]
+        return out
+
+
+class DashboardCube:
+    """Per-tenant minute cubes, refreshed incrementally and snapshotted to disk.
+
+    A refresh recomputes only the (tenant, week) cells touched since the last
+    watermark: weeks of updated tasks, of deleted tasks (tombstones), the
+    previous week of tasks whose date was edited (audit log) and every week of
+    users who moved department ("user_department" on the bus). A snapshot
+    older than CUBE_FULL_REBUILD_HOURS is rebuilt from scratch, which also
+    bounds the damage of a move message this worker missed.
+
+    Each refresh interval one worker does the work and writes the snapshot;
+    the others reload it when told over the invalidation bus, so
+    CUBE_SNAPSHOT_PATH must be shared by all workers.
+    """
+
+    def __init__(self, snapshot_path: str):
+        self.snapshot_path = snapshot_path
+        self.cubes: Dict[int, TenantCube] = {}
+        self.watermark: Optional[datetime] = None
+        self.built_at: Optional[datetime] = None
+        # User id -> when their department move was heard of.
+        self.moved_users: Dict[int, datetime] = {}
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        await self.reload()
+        await self.refresh()
+
+    async def reload(self, key: str = ALL):
+        async with self._lock:
+            try:
+                await asyncio.to_thread(self._read_snapshot)
+            except FileNotFoundError:
+                return
+            except Exception:
+                logger.exception("Ignoring unreadable dashboard cube snapshot %s", self.snapshot_path)
+                return
+            # The worker that wrote it heard of these moves too (allowing for
+            # bus latency) and has already recomputed them.
+            if self.watermark is not None:
+                self._forget_moves(self.watermark - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS))
+
+    def user_moved(self, key: str):
+        """Recompute a user's weeks on the next update; they changed department."""
+        # ALL after a bus reconnect is left to the periodic full rebuild.
+        if key != ALL:
+            self.moved_users[int(key)] = datetime.now(timezone.utc)
+
+    def _forget_moves(self, before: datetime):
+        self.moved_users = {uid: at for uid, at in self.moved_users.items() if at >= before}
+
+    def _slot(self) -> datetime:
+        interval = settings.CUBE_REFRESH_INTERVAL_SECONDS
+        return datetime.fromtimestamp(datetime.now(timezone.utc).timestamp() // interval * interval, timezone.utc)
+
+    async def refresh(self):
+        """Scheduled refresh: the first worker to claim the interval runs it."""
+        if not await claim_run("dashboard_cube_refresh", self._slot()):
+            return
+        if await self.update():
+            await invalidation_bus.publish("dashboard_cube", local=False)
+
+    async def update(self) -> bool:
+        """Bring the cubes up to date and write the snapshot; False if nothing changed."""
+        async with self._lock:
+            now = datetime.now(timezone.utc)
+            stale = self.built_at is None or now - self.built_at > timedelta(hours=settings.CUBE_FULL_REBUILD_HOURS)
+            if stale:
+                await self._rebuild(now)
+            elif not await self._update(now):
+                # An older watermark in the snapshot only widens the next catch-up.
+                return False
+            await asyncio.to_thread(self._write_snapshot)
+            return True
+
+    async def _rebuild(self, now: datetime):
+        # Moves heard of before `now` were committed before the query runs.
+        self._forget_moves(now)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(CUBE_QUERY)
+            rows = result.all()
+        cubes: Dict[int, TenantCube] = {}
+        by_tenant: Dict[int, list] = {}
+        for tenant_id, department, week, task_type, minutes in rows:
+            by_tenant.setdefault(tenant_id, []).append((department, week, task_type, minutes))
+        for tenant_id, tenant_rows in by_tenant.items():
+            cube = TenantCube(min(r[1] for r in tenant_rows))
+            cube.add(tenant_rows)
+            cubes[tenant_id] = cube
+        self.cubes = cubes
+        self.watermark = now
+        self.built_at = now
+
+    async def _update(self, now: datetime) -> bool:
+        # Audit entries are stamped when recorded but written on the next flush.
+        overlap = settings.SYNC_OVERLAP_SECONDS + settings.AUDIT_FLUSH_INTERVAL_SECONDS
+        since = self.watermark - timedelta(seconds=overlap)
+        moved = dict(self.moved_users)
+        async with AsyncSessionLocal() as db:
+            dirty: Set[Tuple[int, date]] = set()
+            stmts = [
+                select(Task.tenant_id, _task_week).where(Task.updated_at >= since).distinct(),
+                select(TaskTombstone.tenant_id, _week(TaskTombstone.date))
+                .where(TaskTombstone.deleted_at >= since, TaskTombstone.date.isnot(None)).distinct(),
+                select(TaskAuditLog.tenant_id, _week(_old_date))
+                .where(TaskAuditLog.created_at >= since, _old_date.isnot(None)).distinct(),
+            ]
+            if moved:
+                stmts.append(select(Task.tenant_id, _task_week).where(Task.user_id.in_(list(moved))).distinct())
+            for stmt in stmts:
+                dirty.update((await db.execute(stmt)).all())
+            # Moves heard of again during the queries wait for the next update.
+            for uid, at in moved.items():
+                if self.moved_users.get(uid) == at:
+                    del self.moved_users[uid]
+            if not dirty:
+                self.watermark = now
+                return False
+
+            weeks = [w for _, w in dirty]
+            result = await db.execute(
+                CUBE_QUERY.where(
+                    Task.date >= min(weeks),
+                    Task.date < max(weeks) + timedelta(days=7),
+                    tuple_(Task.tenant_id, _task_week).in_(list(dirty)),
+                )
+            )
+            rows = result.all()
+
+        by_tenant: Dict[int, list] = {}
+        for tenant_id, department, week, task_type, minutes in rows:
+            by_tenant.setdefault(tenant_id, []).append((department, week, task_type, minutes))
+        for tenant_id, week in dirty:
+            cube = self.cubes.get(tenant_id)
+            if cube is None:
+                cube = self.cubes[tenant_id] = TenantCube(week)
+            cube.clear_weeks([week])
+        for tenant_id, tenant_rows in by_tenant.items():
+            self.cubes[tenant_id].add(tenant_rows)
+        self.watermark = now
+        return True
+
+    def _read_snapshot(self):
+        with np.load(self.snapshot_path) as data:
+            if list(data["departments"]) != [d.name for d in DEPARTMENTS] or list(data["task_types"]) != [t.name for t in TASK_TYPES]:
+                logger.info("Dashboard cube snapshot has different dimensions; rebuilding")
+                return
+            cubes = {}
+            for tenant_id, origin in zip(data["tenant_ids"].tolist(), data["origins"]):
+                cubes[tenant_id] = TenantCube(origin.astype(date), data[f"minutes_{tenant_id}"])
+            self.cubes = cubes
+            self.watermark = data["watermark"].item().replace(tzinfo=timezone.utc)
+            self.built_at = data["built_at"].item().replace(tzinfo=timezone.utc)
+
+    def _write_snapshot(self):
+        tenant_ids = sorted(self.cubes)
+        arrays = {f"minutes_{tid}": self.cubes[tid].minutes for tid in tenant_ids}
+        # A private temp file per write, so concurrent writers cannot interleave.
+        f = tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(self.snapshot_path)), suffix=".tmp", delete=False)
+        try:
+            with f:
+                np.savez(
+                    f,
+                    departments=np.array([d.name for d in DEPARTMENTS]),
+                    task_types=np.array([t.name for t in TASK_TYPES]),
+                    tenant_ids=np.array(tenant_ids, dtype=np.int64),
+                    origins=np.array([self.cubes[tid].origin for tid in tenant_ids], dtype="datetime64[D]"),
+                    watermark=np.datetime64(self.watermark.replace(tzinfo=None), "us"),
+                    built_at=np.datetime64(self.built_at.replace(tzinfo=None), "us"),
+                    **arrays,
+                )
+            # Readers (other workers, the next start) never see a partial file.
+            os.replace(f.name, self.snapshot_path)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+
+    def heatmap(self, tenant_id: int, from_date: date, to_date: date, department: Optional[DepartmentEnum] = None) -> dict:
+        first, last = _monday(from_date), _monday(to_date)
+        cube = self.cubes.get(tenant_id)
+        minutes = cube.window(first, last) if cube else np.zeros((len(DEPARTMENTS), (last - first).days // 7 + 1, len(TASK_TYPES)))
+        departments = DEPARTMENTS
+        if department is not None:
+            minutes = minutes[DEPARTMENT_INDEX[department]:DEPARTMENT_INDEX[department] + 1]
+            departments = [department]
+        return {
+            "weeks": [first + timedelta(weeks=i) for i in range(minutes.shape[1])],
+            "departments": departments,
+            "task_types": TASK_TYPES,
+            "minutes": np.round(minutes, 2).tolist(),
+            "built_at": self.built_at,
+            "refreshed_at": self.watermark,
+        }
+
+
+def get_heatmap(db: AsyncSession, from_date: date, to_date: date, department: Optional[DepartmentEnum] = None) -> dict:
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="to_date cannot be before from_date")
+    if (_monday(to_date) - _monday(from_date)).days // 7 >= MAX_HEATMAP_WEEKS:
+        raise HTTPException(status_code=400, detail=f"Range cannot exceed {MAX_HEATMAP_WEEKS} weeks")
+    return dashboard_cube.heatmap(session_tenant_id(db), from_date, to_date, department)
+
+
+dashboard_cube = DashboardCube(settings.CUBE_SNAPSHOT_PATH)
+# Department changes re-attribute a user's history.
+invalidation_bus.subscribe("user_department", dashboard_cube.user_moved)
+# Another worker wrote a newer snapshot.
+invalidation_bus.subscribe("dashboard_cube", dashboard_cube.reload)
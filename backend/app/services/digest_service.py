@@ -0,0 +1,101 @@
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from jinja2 import Template
+from sqlalchemy import select, func, JSON
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import aliased
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Task, User, TaskStatusEnum, NotificationPreferenceEnum
+from app.utils.mail_config import send_email_batch_async
+from app.utils.scheduler import claim_run
+
+logger = logging.getLogger(__name__)
+
+_owner = aliased(User)
+_manager = aliased(User)
+
+_item = func.json_build_object(
+    "employee_name", _owner.name,
+    "date", Task.date,
+    "task_title", Task.task_title,
+    "task_details", Task.task_details,
+    "is_backdated", Task.is_backdated,
+)
+
+# One row per digest-subscribed manager with all of their team's pending items.
+DIGEST_QUERY = (
+    select(
+        _manager.name,
+        _manager.email,
+        func.count(Task.id),
+        func.json_agg(aggregate_order_by(_item, Task.date, Task.id), type_=JSON),
+    )
+    .select_from(Task)
+    .join(_owner, _owner.id == Task.user_id)
+    .join(_manager, _manager.id == _owner.reporting_manager)
+    .where(
+        Task.status == TaskStatusEnum.ToBeApproved,
+        _manager.is_active == True,
+        _manager.email.isnot(None),
+        _manager.notification_preference == NotificationPreferenceEnum.digest,
+    )
+    .group_by(_manager.id, _manager.name, _manager.email)
+)
+
+
+@lru_cache(maxsize=None)
+def _digest_template() -> Template:
+    with open(os.path.join("templates", "manager_digest_email.txt"), "r") as f:
+        return Template(f.read(), trim_blocks=True, lstrip_blocks=True)
+
+
+def seconds_until_next_digest(now: Optional[datetime] = None) -> float:
+    now = now or datetime.now(timezone.utc)
+    days_ahead = (settings.DIGEST_WEEKDAY - now.weekday()) % 7
+    run_at = datetime.combine(now.date() + timedelta(days=days_ahead), settings.DIGEST_TIME, tzinfo=timezone.utc)
+    if run_at <= now:
+        run_at += timedelta(days=7)
+    return (run_at - now).total_seconds()
+
+
+def last_digest_slot(now: Optional[datetime] = None) -> datetime:
+    """The most recent scheduled digest time at or before `now`."""
+    now = now or datetime.now(timezone.utc)
+    days_back = (now.weekday() - settings.DIGEST_WEEKDAY) % 7
+    slot = datetime.combine(now.date() - timedelta(days=days_back), settings.DIGEST_TIME, tzinfo=timezone.utc)
+    if slot > now:
+        slot -= timedelta(days=7)
+    return slot
+
+
+async def run_scheduled_digest() -> int:
+    # Every worker wakes up for the same slot; only the first one sends.
+    if not await claim_run("manager_digest", last_digest_slot()):
+        return 0
+    return await send_manager_digests()
+
+
+async def send_manager_digests(tenant_id: Optional[int] = None) -> int:
+    """Send every tenant's digests, or only those of `tenant_id`."""
+    stmt = DIGEST_QUERY if tenant_id is None else DIGEST_QUERY.where(Task.tenant_id == tenant_id)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(stmt)
+        rows = result.all()
+
+    template = _digest_template()
+    messages = [
+        (
+            f"[TimeTracking] {task_count} task(s) awaiting your approval",
+            email,
+            template.render(manager_name=name, task_count=task_count, tasks=items),
+        )
+        for name, email, task_count, items in rows
+    ]
+    sent = await send_email_batch_async(messages)
+    logger.info("Sent %d of %d manager digest emails", sent, len(messages))
+    return sent
@@ -0,0 +1,152 @@
+from datetime import datetime
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app import schemas
+from app.config import settings
+from app.models import Task, User, Project, TaskTypeEnum, TaskStatusEnum
+from app.services.task_service import build_task_query
+from app.utils.tenancy import session_tenant_id, tenant_session
+
+TASK_TYPES = list(TaskTypeEnum)
+TASK_STATUSES = list(TaskStatusEnum)
+
+# Every batch shares one dictionary per enum column, so IPC streams never
+# need dictionary replacement and BI tools see a stable category set.
+TASK_TYPE_DICTIONARY = pa.array([t.value for t in TASK_TYPES], pa.string())
+TASK_STATUS_DICTIONARY = pa.array([s.value for s in TASK_STATUSES], pa.string())
+TASK_TYPE_INDEX = {t: i for i, t in enumerate(TASK_TYPES)}
+TASK_STATUS_INDEX = {s: i for i, s in enumerate(TASK_STATUSES)}
+
+ENUM_TYPE = pa.dictionary(pa.int8(), pa.string())
+TIMESTAMP_TYPE = pa.timestamp("us", tz="UTC")
+
+SCHEMA = pa.schema([
+    ("id", pa.int32()),
+    ("date", pa.date32()),
+    ("user_id", pa.int32()),
+    ("user_name", pa.string()),
+    ("project_id", pa.int32()),
+    ("project_name", pa.string()),
+    ("task_title", pa.string()),
+    ("task_details", pa.string()),
+    ("start_time", TIMESTAMP_TYPE),
+    ("end_time", TIMESTAMP_TYPE),
+    ("task_type", ENUM_TYPE),
+    ("reviewer_id", pa.int32()),
+    ("reviewer_name", pa.string()),
+    ("status", ENUM_TYPE),
+    ("is_backdated", pa.bool_()),
+    ("is_approved", pa.bool_()),
+    ("total_time_minutes", pa.float64()),
+])
+
+_reviewer = aliased(User)
+
+# Built once so build_task_query can cache the filtered variants of it.
+EXPORT_QUERY = select(
+    Task.id, Task.date, Task.user_id, User.name, Task.project_id, Project.project_name,
+    Task.task_title, Task.task_details, Task.start_time, Task.end_time, Task.task_type,
+    Task.reviewer_id, _reviewer.name, Task.status, Task.is_backdated, Task.is_approved,
+    Task.total_time_minutes,
+).select_from(Task).outerjoin(User, User.id == Task.user_id) \
+    .outerjoin(Project, Project.id == Task.project_id) \
+    .outerjoin(_reviewer, _reviewer.id == Task.reviewer_id)
+
+FORMATS = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to the response.
+
+    Tracks its own position because the Parquet footer stores absolute offsets.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _enum_column(values, index, dictionary) -> pa.DictionaryArray:
+    indices = pa.array([index[v] if v is not None else None for v in values], pa.int8())
+    return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+
+def _record_batch(rows) -> pa.RecordBatch:
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(SCHEMA, columns):
+        if field.name == "task_type":
+            arrays.append(_enum_column(values, TASK_TYPE_INDEX, TASK_TYPE_DICTIONARY))
+        elif field.name == "status":
+            arrays.append(_enum_column(values, TASK_STATUS_INDEX, TASK_STATUS_DICTIONARY))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=SCHEMA)
+
+
+async def _stream_batches(stmt, params: dict, export_format: str, tenant_id: int):
+    sink = _ChunkSink()
+    file = pa.PythonFile(sink, mode="w")
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(file, SCHEMA, compression="zstd")
+        write = writer.write_batch
+    else:
+        writer = pa.ipc.new_stream(file, SCHEMA)
+        write = writer.write_batch
+
+    # The request's session is closed before the body is streamed, so the
+    # export reads through its own server-side cursor, within the tenant's
+    # budgets. Opening it here rather than in export_task_report means the
+    # request never holds two of the tenant's sessions at once; a budget
+    # error aborts the download instead of returning a 429/503.
+    async with tenant_session(tenant_id) as db:
+        result = await db.stream(stmt, params, execution_options={"yield_per": settings.EXPORT_BATCH_SIZE})
+        async for rows in result.partitions():
+            write(_record_batch(rows))
+            yield sink.drain()
+
+    writer.close()
+    yield sink.drain()
+
+
+async def export_task_report(filters: schemas.TaskFilterRequest, db: AsyncSession, current_user: User, search: Optional[str], export_format: str):
+    stmt, params = await build_task_query(filters, db, current_user, search, EXPORT_QUERY)
+
+    media_type, extension = FORMATS[export_format]
+    filename = f"task_report_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.{extension}"
+    return StreamingResponse(
+        _stream_batches(stmt, params, export_format, session_tenant_id(db)),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
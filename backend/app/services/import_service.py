@@ -0,0 +1,217 @@
+import asyncio
+from datetime import date, datetime, timezone
+from typing import Iterator, List
+
+import pandas as pd
+from fastapi import HTTPException, UploadFile
+from openpyxl import load_workbook
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Task, User, Project, TaskTypeEnum, TaskStatusEnum
+from app.services.user_service import validate_timezone
+
+REQUIRED_COLUMNS = ["employee_code", "date", "project", "task_title", "start_time", "end_time", "task_type"]
+OPTIONAL_COLUMNS = ["task_details", "reviewer_employee_code"]
+
+COPY_COLUMNS = [
+    "tenant_id", "user_id", "date", "project_id", "task_title", "task_details", "start_time", "end_time",
+    "task_type", "reviewer_id", "status", "is_backdated", "is_approved",
+    "created_by", "created_at", "updated_at",
+]
+
+# "9:30", "09:30:00", "9:30 pm": a time of day without a date.
+TIME_ONLY_PATTERN = r"^\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:\s*[AaPp][Mm])?$"
+
+TASK_TYPE_LOOKUP = {
+    **{t.value.lower(): t.name for t in TaskTypeEnum},
+    **{t.name.lower(): t.name for t in TaskTypeEnum},
+}
+
+
+def _csv_chunks(upload: UploadFile, chunk_size: int) -> Iterator[pd.DataFrame]:
+    return pd.read_csv(upload.file, dtype=str, keep_default_na=False, chunksize=chunk_size)
+
+
+def _xlsx_chunks(upload: UploadFile, chunk_size: int) -> Iterator[pd.DataFrame]:
+    workbook = load_workbook(upload.file, read_only=True, data_only=True)
+    rows = workbook.active.iter_rows(values_only=True)
+    header = [str(c) if c is not None else "" for c in next(rows, [])]
+    width = len(header)
+    start = 0
+    while True:
+        chunk = []
+        for row in rows:
+            values = ["" if c is None else c for c in row[:width]]
+            chunk.append(values + [""] * (width - len(values)))
+            if len(chunk) >= chunk_size:
+                break
+        if not chunk:
+            break
+        df = pd.DataFrame(chunk, columns=header)
+        df.index = range(start, start + len(df))
+        start += len(df)
+        yield df
+    workbook.close()
+
+
+def _parse_times(values: pd.Series, dates: pd.Series, tz: str) -> pd.Series:
+    """Parse to UTC; naive values are wall-clock times in `tz`.
+
+    Time-only values are taken to be on the row's `date`.
+    """
+    time_only = values.str.match(TIME_ONLY_PATTERN)
+    if time_only.any():
+        # Normalise "9:30" / "09:30:00" / "9:30 pm" first so the combined
+        # column has one format for pandas to infer.
+        times = pd.to_datetime(values[time_only], format="mixed", errors="coerce").dt.strftime("%H:%M:%S")
+        values = values.where(~time_only, dates[time_only].astype(str) + " " + times)
+    parsed = pd.to_datetime(values.replace("", None), errors="coerce")
+    if isinstance(parsed.dtype, pd.DatetimeTZDtype):
+        return parsed.dt.tz_convert("UTC")
+    if pd.api.types.is_datetime64_dtype(parsed):
+        return parsed.dt.tz_localize(tz, ambiguous="NaT", nonexistent="NaT").dt.tz_convert("UTC")
+    # Mixed naive/offset values in one column.
+    return pd.to_datetime(values.replace("", None), errors="coerce", utc=True)
+
+
+class TaskImporter:
+    """Validates uploaded timesheet rows in bulk and loads the valid ones.
+
+    Users and projects are resolved through lookup maps built once per import,
+    and the create_task time rules are checked column-wise on each chunk. The
+    monthly backdated limit is not applied: imports are historical by design
+    and only admins can run them.
+    """
+
+    def __init__(self, db: AsyncSession, current_user: User, tz: str):
+        self.db = db
+        self.current_user = current_user
+        # COPY bypasses the ORM, so rows carry the tenant explicitly.
+        self.tenant_id = current_user.tenant_id
+        self.tz = tz
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+
+    async def load_lookups(self):
+        users_result = await self.db.execute(select(User.employee_code, User.id))
+        self.user_map = {str(code): uid for code, uid in users_result.all()}
+
+        projects_result = await self.db.execute(select(Project.id, Project.project_code, Project.project_name))
+        projects = projects_result.all()
+        # The "project" column may hold a code or a name; codes win on clashes.
+        self.project_map = {name.strip().lower(): pid for pid, _, name in projects}
+        self.project_map.update({code.strip().lower(): pid for pid, code, _ in projects if code})
+
+    def _validate(self, df: pd.DataFrame):
+        df = df.rename(columns=lambda c: str(c).strip().lower())
+        missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(missing)}")
+        for column in OPTIONAL_COLUMNS:
+            if column not in df.columns:
+                df[column] = ""
+        df = df.astype(str).apply(lambda col: col.str.strip())
+
+        out = pd.DataFrame(index=df.index)
+        out["user_id"] = df["employee_code"].map(self.user_map)
+        out["project_id"] = df["project"].str.lower().map(self.project_map)
+        out["reviewer_id"] = df["reviewer_employee_code"].map(self.user_map)
+        out["task_type"] = df["task_type"].str.lower().map(TASK_TYPE_LOOKUP)
+        out["date"] = pd.to_datetime(df["date"].replace("", None), errors="coerce").dt.date
+        out["start_time"] = _parse_times(df["start_time"], out["date"], self.tz)
+        out["end_time"] = _parse_times(df["end_time"], out["date"], self.tz)
+        out["task_title"] = df["task_title"]
+        out["task_details"] = df["task_details"]
+
+        has_reviewer = df["reviewer_employee_code"] != ""
+        checks = [
+            (out["user_id"].isna(), "Unknown employee_code"),
+            (out["project_id"].isna(), "Unknown project"),
+            (has_reviewer & out["reviewer_id"].isna(), "Unknown reviewer_employee_code"),
+            (has_reviewer & (out["reviewer_id"] == out["user_id"]), "Reviewer cannot be the same as the user"),
+            (out["task_type"].isna(), "Invalid task_type"),
+            (out["date"].isna(), "Invalid date"),
+            (out["start_time"].isna(), "Invalid start_time"),
+            (out["end_time"].isna(), "Invalid end_time"),
+            (out["end_time"] < out["start_time"], "End time cannot be before start time"),
+            ((out["task_title"] == "") | (out["task_title"].str.len() > 50), "task_title must be 1-50 characters"),
+            (out["task_details"].str.len() > 256, "task_details must be at most 256 characters"),
+        ]
+
+        invalid = pd.Series(False, index=out.index)
+        for mask, _ in checks:
+            invalid |= mask.fillna(False).astype(bool)
+
+        if invalid.any():
+            row_errors = {idx: [] for idx in invalid[invalid].index}
+            for mask, message in checks:
+                for idx in mask[mask.fillna(False).astype(bool)].index:
+                    row_errors[idx].append(message)
+            for idx, messages in row_errors.items():
+                self.failed += 1
+                if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                    # +2: 1-based rows plus the header line.
+                    self.errors.append({"row": int(idx) + 2, "errors": messages})
+
+        return out[~invalid]
+
+    def _records(self, valid: pd.DataFrame) -> List[tuple]:
+        now = datetime.now(timezone.utc)
+        today = date.today()
+        # Convert whole columns up front; per-value conversion dominates otherwise.
+        reviewer_ids = valid["reviewer_id"].astype("Int64").astype(object).where(valid["reviewer_id"].notna(), None)
+        details = valid["task_details"].where(valid["task_details"] != "", None)
+        starts = pd.DatetimeIndex(valid["start_time"]).to_pydatetime()
+        ends = pd.DatetimeIndex(valid["end_time"]).to_pydatetime()
+
+        return [
+            (
+                self.tenant_id, user_id, task_date, project_id, title, detail, start, end, task_type, reviewer_id,
+                TaskStatusEnum.Done.name, task_date != today, True,
+                self.current_user.id, now, now,
+            )
+            for user_id, task_date, project_id, title, detail, start, end, task_type, reviewer_id in zip(
+                valid["user_id"].astype("int64").tolist(), valid["date"], valid["project_id"].astype("int64").tolist(),
+                valid["task_title"], details, starts, ends, valid["task_type"], reviewer_ids,
+            )
+        ]
+
+    async def _load(self, records: List[tuple]):
+        if settings.IMPORT_USE_COPY:
+            conn = await self.db.connection()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table("tasks", records=records, columns=COPY_COLUMNS)
+        else:
+            await self.db.execute(insert(Task), [dict(zip(COPY_COLUMNS, r)) for r in records])
+
+    async def run(self, chunks: Iterator[pd.DataFrame]):
+        await self.load_lookups()
+        while True:
+            # Parsing is CPU bound; keep it off the event loop.
+            df = await asyncio.to_thread(next, chunks, None)
+            if df is None:
+                break
+            valid = self._validate(df)
+            if not valid.empty:
+                await self._load(self._records(valid))
+                self.imported += len(valid)
+        await self.db.commit()
+
+
+async def import_tasks(upload: UploadFile, tz: str, db: AsyncSession, current_user: User) -> dict:
+    validate_timezone(tz)
+    filename = (upload.filename or "").lower()
+    chunk_size = settings.IMPORT_CHUNK_SIZE
+    if filename.endswith(".csv"):
+        chunks = _csv_chunks(upload, chunk_size)
+    elif filename.endswith(".xlsx"):
+        chunks = _xlsx_chunks(upload, chunk_size)
+    else:
+        raise HTTPException(status_code=400, detail="Only .csv and .xlsx files are supported")
+
+    importer = TaskImporter(db, current_user, tz)
+    await importer.run(chunks)
+    return {"imported": importer.imported, "failed": importer.failed, "errors": importer.errors}
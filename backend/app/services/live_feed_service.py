@@ -0,0 +1,179 @@
+import asyncio
+import json
+from typing import Dict, Iterable, List, Optional, Set
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Task, TaskStatusEnum
+from app.utils.cache import ALL, invalidation_bus
+
+# Queue sentinel telling a stream it dropped events and must resend a snapshot.
+RESYNC = None
+
+
+class Subscription:
+    __slots__ = ("tenant_id", "user_ids", "queue")
+
+    def __init__(self, tenant_id: int, user_ids: Optional[List[int]]):
+        self.tenant_id = tenant_id
+        self.user_ids = user_ids
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.LIVE_FEED_QUEUE_SIZE)
+
+
+def _format_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+def _entry(task: Task) -> dict:
+    return {
+        "id": task.id,
+        "tenant_id": task.tenant_id,
+        "user_id": task.user_id,
+        "project_id": task.project_id,
+        "title": task.task_title,
+        "start_time": task.start_time.isoformat() if task.start_time else None,
+    }
+
+
+class ActiveTimerFeed:
+    """In-memory registry of running tasks that pushes deltas to SSE subscribers.
+
+    Subscribers are indexed by the user ids they may watch (from the TL /
+    reporting manager hierarchy), or by tenant for unrestricted viewers, so
+    an event only touches the queues that care about it. Each event is serialised once and the same string is put on
+    every target queue; an idle subscriber costs one small object and a queue.
+
+    Changes made in this worker are forwarded to the others on the "live_feed"
+    namespace of the invalidation bus, so every worker holds the same registry.
+    """
+
+    def __init__(self):
+        self.active: Dict[int, dict] = {}
+        self._by_user: Dict[int, Set[Subscription]] = {}
+        self._watch_all: Dict[int, Set[Subscription]] = {}
+        self._subscribers: Set[Subscription] = set()
+        self._forwarding: Set[asyncio.Task] = set()
+
+    async def load(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Task).where(Task.status == TaskStatusEnum.InProgress, Task.end_time.is_(None)))
+            self.active = {task.id: _entry(task) for task in result.scalars().all()}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, tenant_id: int, user_ids: Optional[List[int]]) -> Subscription:
+        sub = Subscription(tenant_id, user_ids)
+        self._subscribers.add(sub)
+        if user_ids is None:
+            self._watch_all.setdefault(tenant_id, set()).add(sub)
+        else:
+            for user_id in user_ids:
+                self._by_user.setdefault(user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        self._subscribers.discard(sub)
+        if sub.user_ids is None:
+            subs = self._watch_all.get(sub.tenant_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._watch_all[sub.tenant_id]
+            return
+        for user_id in sub.user_ids:
+            subs = self._by_user.get(user_id)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._by_user[user_id]
+
+    def snapshot_event(self, sub: Subscription) -> str:
+        if sub.user_ids is None:
+            entries = [e for e in self.active.values() if e["tenant_id"] == sub.tenant_id]
+        else:
+            watched = set(sub.user_ids)
+            entries = [e for e in self.active.values() if e["user_id"] in watched]
+        return _format_event("snapshot", entries)
+
+    def _put(self, subs: Iterable[Subscription], message):
+        for sub in subs:
+            try:
+                sub.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and let it resync from a snapshot.
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.queue.put_nowait(RESYNC)
+
+    def _broadcast(self, entry: dict, message: str):
+        self._put(self._by_user.get(entry["user_id"], ()), message)
+        self._put(self._watch_all.get(entry["tenant_id"], ()), message)
+
+    def _start(self, entry: dict):
+        previous = self.active.get(entry["id"])
+        if previous and previous["user_id"] != entry["user_id"]:
+            self._broadcast(previous, _format_event("stop", {"id": entry["id"]}))
+        if entry != previous:
+            self.active[entry["id"]] = entry
+            self._broadcast(entry, _format_event("start", entry))
+
+    def _stop(self, task_id: int):
+        previous = self.active.pop(task_id, None)
+        if previous:
+            self._broadcast(previous, _format_event("stop", {"id": task_id}))
+
+    def _forward(self, change: dict):
+        payload = json.dumps(change, separators=(",", ":"))
+        task = asyncio.ensure_future(invalidation_bus.publish("live_feed", payload, local=False))
+        # Hold a reference until the send completes.
+        self._forwarding.add(task)
+        task.add_done_callback(self._forwarding.discard)
+
+    def publish_task(self, task: Task):
+        """Reflect the current state of `task` after create/complete/edit."""
+        if task.status == TaskStatusEnum.InProgress and task.end_time is None:
+            entry = _entry(task)
+            self._start(entry)
+            self._forward({"start": entry})
+        else:
+            # Forwarded even if not running here, in case this worker missed the start.
+            self.remove_task(task.id)
+
+    def remove_task(self, task_id: int):
+        self._stop(task_id)
+        self._forward({"stop": task_id})
+
+    async def _resync(self):
+        await self.load()
+        self._put(self._subscribers, RESYNC)
+
+    def receive(self, key: str):
+        """Bus handler: apply a change made in another worker."""
+        if key == ALL:
+            # Messages may have been missed; reload and resend snapshots.
+            return self._resync()
+        change = json.loads(key)
+        if "start" in change:
+            self._start(change["start"])
+        else:
+            self._stop(change["stop"])
+
+    async def heartbeat(self):
+        # One timer for every connection instead of a timeout per stream.
+        self._put(self._subscribers, ": keep-alive\n\n")
+
+    async def stream(self, sub: Subscription):
+        try:
+            yield self.snapshot_event(sub)
+            while True:
+                message = await sub.queue.get()
+                yield self.snapshot_event(sub) if message is RESYNC else message
+        finally:
+            self.unsubscribe(sub)
+
+
+live_feed = ActiveTimerFeed()
+invalidation_bus.subscribe("live_feed", live_feed.receive)
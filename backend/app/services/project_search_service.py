@@ -0,0 +1,111 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import Project
+from app.utils.cache import ALL, invalidation_bus
+
+# Lower rank sorts first.
+RANK_CODE_EXACT = 0
+RANK_CODE_PREFIX = 1
+RANK_NAME_PREFIX = 2
+RANK_WORD_PREFIX = 3
+
+
+def _keys(project_code: Optional[str], project_name: str) -> List[Tuple[str, int]]:
+    keys = []
+    if project_code:
+        keys.append((project_code.strip().lower(), RANK_CODE_PREFIX))
+    name = project_name.strip().lower()
+    keys.append((name, RANK_NAME_PREFIX))
+    keys.extend((word, RANK_WORD_PREFIX) for word in name.split()[1:])
+    return keys
+
+
+class ProjectSearchIndex:
+    """Prefix index over active projects' codes, names and name words.
+
+    Each tenant's keys live in one sorted list of (key, rank, project id) tuples, so a
+    prefix lookup is a bisect to the first candidate followed by a scan of
+    the matching run. project_service keeps it current on every write.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, List[Tuple[str, int, int]]] = {}
+        self._projects: Dict[int, dict] = {}
+
+    async def load(self):
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(Project.id, Project.tenant_id, Project.project_code, Project.project_name)
+                .where(Project.is_active == True)
+            )
+            rows = result.all()
+        projects = {}
+        entries: Dict[int, List[Tuple[str, int, int]]] = {}
+        for project_id, tenant_id, code, name in rows:
+            projects[project_id] = {"id": project_id, "tenant_id": tenant_id, "project_code": code, "project_name": name}
+            entries.setdefault(tenant_id, []).extend((key, rank, project_id) for key, rank in _keys(code, name))
+        for tenant_entries in entries.values():
+            tenant_entries.sort()
+        self._projects = projects
+        self._entries = entries
+
+    async def refresh(self, key: str):
+        """Bus handler: re-read one project (or everything) written by another worker."""
+        if key == ALL:
+            await self.load()
+            return
+        project_id = int(key)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Project).where(Project.id == project_id))
+            project = result.scalar_one_or_none()
+        if project:
+            self.upsert(project)
+        else:
+            self.remove(project_id)
+
+    def upsert(self, project: Project):
+        self.remove(project.id)
+        if not project.is_active:
+            return
+        self._projects[project.id] = {
+            "id": project.id, "tenant_id": project.tenant_id,
+            "project_code": project.project_code, "project_name": project.project_name,
+        }
+        entries = self._entries.setdefault(project.tenant_id, [])
+        for key, rank in _keys(project.project_code, project.project_name):
+            insort(entries, (key, rank, project.id))
+
+    def remove(self, project_id: int):
+        project = self._projects.pop(project_id, None)
+        if project is None:
+            return
+        entries = self._entries.get(project["tenant_id"], [])
+        for key, rank in _keys(project["project_code"], project["project_name"]):
+            entry = (key, rank, project_id)
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+
+    def search(self, tenant_id: int, query: str, limit: int) -> List[dict]:
+        prefix = " ".join(query.lower().split())
+        entries = self._entries.get(tenant_id)
+        if not prefix or not entries:
+            return []
+        best: Dict[int, int] = {}
+        i = bisect_left(entries, (prefix,))
+        while i < len(entries) and entries[i][0].startswith(prefix):
+            key, rank, project_id = entries[i]
+            if rank == RANK_CODE_PREFIX and key == prefix:
+                rank = RANK_CODE_EXACT
+            if rank < best.get(project_id, RANK_WORD_PREFIX + 1):
+                best[project_id] = rank
+            i += 1
+        ranked = sorted(best, key=lambda pid: (best[pid], self._projects[pid]["project_name"].lower(), pid))
+        return [self._projects[pid] for pid in ranked[:limit]]
+
+
+project_index = ProjectSearchIndex()
+invalidation_bus.subscribe("projects", project_index.refresh)
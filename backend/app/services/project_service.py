@@ -1,17 +1,30 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
+from typing import Optional
 from app import models, schemas
+from app.utils.fields import select_columns
+from app.services.project_search_service import project_index
+from app.utils.cache import invalidation_bus
+from app.utils.tenancy import session_tenant_id
+
+PROJECT_FIELDS = ["id", "project_code", "project_name", "project_description", "is_active"]
 
 async def create_project(data: schemas.ProjectCreate, db: AsyncSession) -> models.Project:
     project = models.Project(**data.dict())
     db.add(project)
     await db.commit()
     await db.refresh(project)
+    project_index.upsert(project)
+    await invalidation_bus.publish("projects", project.id, local=False)
     return project
 
-async def get_all_projects(skip: int, limit: int, db: AsyncSession):
-    result = await db.execute(select(models.Project).offset(skip).limit(limit))
+async def get_all_projects(skip: int, limit: int, db: AsyncSession, fields: Optional[str] = None):
+    columns = select_columns(models.Project, fields, PROJECT_FIELDS)
+    query = select(*columns) if columns else select(models.Project)
+    result = await db.execute(query.offset(skip).limit(limit))
+    if columns:
+        return [dict(row) for row in result.mappings()]
     return result.scalars().all()
 
 async def get_project_by_id(project_id: int, db: AsyncSession) -> models.Project:
@@ -27,10 +40,17 @@ async def update_project(project_id: int, updates: schemas.ProjectUpdate, db: As
         setattr(project, key, value)
     await db.commit()
     await db.refresh(project)
+    project_index.upsert(project)
+    await invalidation_bus.publish("projects", project.id, local=False)
     return project
 
 async def delete_project(project_id: int, db: AsyncSession):
     project = await get_project_by_id(project_id, db)
     await db.delete(project)
     await db.commit()
+    project_index.remove(project_id)
+    await invalidation_bus.publish("projects", project_id, local=False)
     return {"detail": "Project deleted successfully"}
+
+def search_projects(query: str, limit: int, db: AsyncSession):
+    return project_index.search(session_tenant_id(db), query, limit)
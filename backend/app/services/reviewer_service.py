@@ -0,0 +1,144 @@
+import asyncio
+import heapq
+import json
+from typing import Dict, List, Optional, Set, Tuple
+from fastapi import HTTPException
+from sqlalchemy import select, func
+
+from app.database import AsyncSessionLocal
+from app.models import Task, User, RoleEnum, TaskStatusEnum
+from app.utils.cache import ALL, invalidation_bus
+
+
+def open_reviewer(state: Optional[dict]) -> Optional[int]:
+    """Reviewer a task snapshot counts against, i.e. one waiting in an approval queue."""
+    if state and state["reviewer_id"] is not None and state["status"] == TaskStatusEnum.ToBeApproved:
+        return state["reviewer_id"]
+    return None
+
+
+class ReviewerLoadBalancer:
+    """Least-loaded reviewer per team, kept current from task changes.
+
+    A team is everyone reporting to the same manager; its reviewers are that
+    manager plus the TLs reporting to them. Each team has a heap of
+    (open reviews, reviewer id) entries. A load change pushes a fresh entry
+    instead of re-heapifying, and entries that no longer match the current
+    load are discarded when they reach the top (lazy deletion), so both
+    updates and picks are O(log n).
+
+    Load changes are forwarded to the other workers over the "reviewer_load"
+    bus namespace, so each worker's counts trail the others' writes by the bus
+    latency only; two workers picking within that window can still choose the
+    same reviewer. The periodic resync corrects any drift.
+    """
+
+    def __init__(self):
+        self.load: Dict[int, int] = {}
+        self._teams: Dict[int, Set[int]] = {}
+        self._teams_of: Dict[int, Set[int]] = {}
+        self._heaps: Dict[int, List[Tuple[int, int]]] = {}
+        self._forwarding: Set[asyncio.Task] = set()
+
+    async def resync(self):
+        async with AsyncSessionLocal() as db:
+            users_result = await db.execute(
+                select(User.id, User.role, User.reporting_manager).where(
+                    User.is_active == True, User.role.in_([RoleEnum.Manager, RoleEnum.TL])
+                )
+            )
+            load_result = await db.execute(
+                select(Task.reviewer_id, func.count()).where(
+                    Task.reviewer_id.isnot(None), Task.status == TaskStatusEnum.ToBeApproved
+                ).group_by(Task.reviewer_id)
+            )
+
+        teams: Dict[int, Set[int]] = {}
+        for user_id, role, manager_id in users_result.all():
+            if role == RoleEnum.Manager:
+                teams.setdefault(user_id, set()).add(user_id)
+            if role == RoleEnum.TL and manager_id is not None:
+                teams.setdefault(manager_id, set()).add(user_id)
+
+        teams_of: Dict[int, Set[int]] = {}
+        for team_id, members in teams.items():
+            for reviewer_id in members:
+                teams_of.setdefault(reviewer_id, set()).add(team_id)
+
+        self.load = dict(load_result.all())
+        self._teams = teams
+        self._teams_of = teams_of
+        self._heaps = {team_id: self._build_heap(team_id) for team_id in teams}
+
+    def _build_heap(self, team_id: int) -> List[Tuple[int, int]]:
+        heap = [(self.load.get(r, 0), r) for r in self._teams[team_id]]
+        heapq.heapify(heap)
+        return heap
+
+    def _valid(self, team_id: int, entry: Tuple[int, int]) -> bool:
+        count, reviewer_id = entry
+        return reviewer_id in self._teams[team_id] and self.load.get(reviewer_id, 0) == count
+
+    def _adjust(self, reviewer_id: int, delta: int):
+        count = max(self.load.get(reviewer_id, 0) + delta, 0)
+        self.load[reviewer_id] = count
+        for team_id in self._teams_of.get(reviewer_id, ()):
+            heap = self._heaps[team_id]
+            heapq.heappush(heap, (count, reviewer_id))
+            # Stale entries are only dropped when they surface; rebuild
+            # before a busy team's heap grows without bound.
+            if len(heap) > 4 * len(self._teams[team_id]) + 16:
+                self._heaps[team_id] = self._build_heap(team_id)
+
+    def task_changed(self, before: Optional[dict], after: Optional[dict]):
+        """Apply a task create/update/delete given audit snapshots of both sides."""
+        old, new = open_reviewer(before), open_reviewer(after)
+        if old == new:
+            return
+        self._move(old, new)
+        payload = json.dumps({"old": old, "new": new}, separators=(",", ":"))
+        task = asyncio.ensure_future(invalidation_bus.publish("reviewer_load", payload, local=False))
+        # Hold a reference until the send completes.
+        self._forwarding.add(task)
+        task.add_done_callback(self._forwarding.discard)
+
+    def _move(self, old: Optional[int], new: Optional[int]):
+        if old is not None:
+            self._adjust(old, -1)
+        if new is not None:
+            self._adjust(new, +1)
+
+    def receive(self, key: str):
+        """Bus handler: apply a load change made in another worker."""
+        if key == ALL:
+            # Changes may have been missed; reload everything.
+            return self.resync()
+        change = json.loads(key)
+        self._move(change["old"], change["new"])
+
+    def pick(self, team_id: Optional[int], exclude: int) -> int:
+        """Least-loaded reviewer of `team_id` other than `exclude` (the task owner)."""
+        heap = self._heaps.get(team_id)
+        held = []
+        chosen = None
+        while heap:
+            entry = heap[0]
+            if not self._valid(team_id, entry):
+                heapq.heappop(heap)
+                continue
+            if entry[1] == exclude:
+                held.append(heapq.heappop(heap))
+                continue
+            chosen = entry[1]
+            break
+        for entry in held:
+            heapq.heappush(heap, entry)
+        if chosen is None:
+            raise HTTPException(status_code=400, detail="No eligible reviewer available for this user")
+        return chosen
+
+
+reviewer_balancer = ReviewerLoadBalancer()
+# Rebuild when a user write in any worker changes team membership.
+invalidation_bus.subscribe("teams", lambda key: reviewer_balancer.resync())
+invalidation_bus.subscribe("reviewer_load", reviewer_balancer.receive)
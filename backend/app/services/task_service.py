@@ -1,18 +1,35 @@
-from datetime import datetime, date, timezone
+from datetime import datetime, date, timezone, timedelta
+from functools import lru_cache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, func
+from sqlalchemy import select, update, or_, func, delete, bindparam, tuple_, Integer, Float, Numeric, cast
 from typing import List, Optional
 from app import schemas
-from app.models import Task, User, Project, RoleEnum, TaskStatusEnum
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Task, TaskTombstone, TaskAuditLog, User, Project, RoleEnum, TaskStatusEnum, NotificationPreferenceEnum
 from fastapi import HTTPException
 import io
+import base64
+import json
 from fastapi.responses import StreamingResponse
 import pandas as pd
 import pytz
 from app.utils.mail_config import send_email_async
+from app.services.live_feed_service import live_feed
+from app.services.audit_service import audit_log, snapshot, diff
+from app.services.reviewer_service import reviewer_balancer
+from app.services.user_service import hierarchy_cache
+from app.utils.fields import select_columns
+from app.utils.scheduler import claim_run
+from app.utils.tenancy import session_tenant_id
 from jinja2 import Template
 import os
 
+TASK_FIELDS = [
+    "id", "user_id", "date", "project_id", "task_title", "task_details", "start_time", "end_time",
+    "total_time_minutes", "task_type", "reviewer_id", "status", "is_backdated", "is_approved", "created_by",
+]
+
 def ensure_utc(dt: Optional[datetime]) -> Optional[datetime]:
     """Ensure datetime is timezone-aware and in UTC"""
     if not dt:
@@ -42,6 +59,19 @@ def render_email_template(file_path: str, context: dict) -> str:
     return template.render(**context)
 
 
+async def check_references(db: AsyncSession, project_id: Optional[int] = None, user_ids: List[Optional[int]] = ()):
+    """404 unless the referenced project/users exist in the session's tenant."""
+    if project_id is not None:
+        result = await db.execute(select(Project.id).where(Project.id == project_id))
+        if result.scalar_one_or_none() is None:
+            raise HTTPException(status_code=404, detail="Project not found")
+    wanted = {uid for uid in user_ids if uid is not None}
+    if wanted:
+        result = await db.execute(select(User.id).where(User.id.in_(wanted)))
+        if len(result.all()) != len(wanted):
+            raise HTTPException(status_code=404, detail="User not found")
+
+
 async def create_task(task: schemas.TaskCreate, db: AsyncSession) -> Task:
     today = date.today()
     is_backdated = task.date != today
@@ -56,6 +86,8 @@ async def create_task(task: schemas.TaskCreate, db: AsyncSession) -> Task:
     if task.reviewer_id is not None and task.reviewer_id == task.user_id:
         raise HTTPException(status_code=400, detail="Reviewer cannot be the same as the user")
 
+    await check_references(db, task.project_id, [task.reviewer_id, task.created_by])
+
     # Check backdated limit
     if is_backdated and user.role in [RoleEnum.Employee, RoleEnum.TL]:
         first_day = today.replace(day=1)
@@ -80,7 +112,9 @@ async def create_task(task: schemas.TaskCreate, db: AsyncSession) -> Task:
         raise HTTPException(status_code=400, detail="End time cannot be before start time")
 
     # Prepare task data
-    task_data = task.dict()
+    task_data = task.dict(exclude={"auto_assign_reviewer"})
+    if task.auto_assign_reviewer and task.reviewer_id is None:
+        task_data["reviewer_id"] = reviewer_balancer.pick(user.reporting_manager, user.id)
     task_data["is_backdated"] = is_backdated
     task_data["is_approved"] = False
     task_data["start_time"] = start_time
@@ -91,20 +125,20 @@ async def create_task(task: schemas.TaskCreate, db: AsyncSession) -> Task:
 
     new_task = Task(**task_data)
 
-    # Calculate total_time_minutes
-    if start_time and end_time:
-        total_minutes = (end_time - start_time).total_seconds() / 60
-        new_task.total_time_minutes = round(total_minutes, 2)
-
     db.add(new_task)
     await db.commit()
     await db.refresh(new_task)
+    live_feed.publish_task(new_task)
+    after = snapshot(new_task)
+    reviewer_balancer.task_changed(None, after)
+    audit_log.record(new_task.tenant_id, new_task.id, new_task.user_id, new_task.created_by, "create", diff(None, after))
 
     # Send backdated email
     if is_backdated and user.role in [RoleEnum.Employee, RoleEnum.TL] and user.reporting_manager:
         manager_result = await db.execute(select(User).where(User.id == user.reporting_manager))
         manager = manager_result.scalar_one_or_none()
-        if manager and manager.email:
+        # Managers on digest delivery get this in the weekly digest instead.
+        if manager and manager.email and manager.notification_preference == NotificationPreferenceEnum.immediate:
             template_path = os.path.join("templates", "backdated_task_email.txt")
             body = render_email_template(template_path, {
                 "manager_name": manager.name,
@@ -128,6 +162,7 @@ async def complete_task(task_id: int, end_time: Optional[datetime], db: AsyncSes
     if task.status != TaskStatusEnum.InProgress:
         raise HTTPException(status_code=400, detail="Only 'In Progress' tasks can be completed")
 
+    before = snapshot(task)
     final_end_time = ensure_utc(end_time) or datetime.now(timezone.utc)
     # Ensure task.start_time is timezone-aware
     task_start_time = task.start_time
@@ -137,51 +172,78 @@ async def complete_task(task_id: int, end_time: Optional[datetime], db: AsyncSes
     if final_end_time < task_start_time:
         raise HTTPException(status_code=400, detail="End time cannot be before start time")
 
-    total_time = (final_end_time - task.start_time).total_seconds() / 60
     task.end_time = final_end_time
     task.status = TaskStatusEnum.Done
-    task.total_time_minutes = round(total_time, 2)
 
     await db.commit()
     await db.refresh(task)
+    live_feed.publish_task(task)
+    audit_log.record(task.tenant_id, task.id, task.user_id, None, "complete", diff(before, snapshot(task)))
     return task
 
 
-async def list_tasks(filters: schemas.TaskFilterRequest, db: AsyncSession, current_user: User, page: int, page_size: int, search: Optional[str]) -> List[Task]:
-    stmt = select(Task)
-
+async def visible_user_ids(db: AsyncSession, current_user: User) -> Optional[List[int]]:
+    """Ids of users whose tasks current_user may see, or None if unrestricted."""
     if current_user.role == RoleEnum.Employee:
-        stmt = stmt.where(Task.user_id == current_user.id)
-    elif current_user.role == RoleEnum.TL:
-        tl_result = await db.execute(select(User.id).where(User.tl == current_user.id))
-        ids = [r for r, in tl_result.all()]
-        stmt = stmt.where(Task.user_id.in_([current_user.id] + ids))
-    elif current_user.role == RoleEnum.Manager:
-        mgr_result = await db.execute(select(User.id).where(User.reporting_manager == current_user.id))
-        ids = [r for r, in mgr_result.all()]
-        stmt = stmt.where(Task.user_id.in_([current_user.id] + ids))
+        return [current_user.id]
+    if current_user.role not in (RoleEnum.TL, RoleEnum.Manager):
+        return None
 
-    if filters.user_id:
-        stmt = stmt.where(Task.user_id == filters.user_id)
-    if filters.project_id:
-        stmt = stmt.where(Task.project_id == filters.project_id)
-    if filters.task_type:
-        stmt = stmt.where(Task.task_type == filters.task_type)
-    if filters.status:
-        stmt = stmt.where(Task.status == filters.status)
-    if filters.from_date and filters.to_date:
-        stmt = stmt.where(Task.date.between(filters.from_date, filters.to_date))
-    if search:
+    cache_key = f"{current_user.role.name}:{current_user.id}"
+    user_ids = hierarchy_cache.get(cache_key)
+    if user_ids is None:
+        version = hierarchy_cache.version()
+        if current_user.role == RoleEnum.TL:
+            result = await db.execute(select(User.id).where(User.tl == current_user.id))
+        else:
+            result = await db.execute(select(User.id).where(User.reporting_manager == current_user.id))
+        user_ids = [current_user.id] + [r for r, in result.all()]
+        hierarchy_cache.set(cache_key, user_ids, version)
+    # Callers may extend the list; hand out a copy.
+    return list(user_ids)
+
+
+@lru_cache(maxsize=512)
+def _task_query(base, scoped: bool, by_user: bool, by_project: bool, by_type: bool, by_status: bool,
+                by_date: bool, by_search: bool, backdated_mode: Optional[str], paged: bool):
+    """Build (once per filter shape) a task query whose values are bind parameters.
+
+    The same statement object is reused for every request with that shape, so
+    SQLAlchemy skips rebuilding it and its memoised cache key hits the compiled
+    cache; asyncpg then reuses the prepared statement on the connection.
+    `base` is None for full Task rows, a tuple of Task column names for sparse
+    fieldsets, or a module-level select() such as the report export query.
+    """
+    if base is None:
+        stmt = select(Task)
+    elif isinstance(base, tuple):
+        stmt = select(*[getattr(Task, name) for name in base])
+    else:
+        stmt = base
+
+    if scoped:
+        stmt = stmt.where(Task.user_id.in_(bindparam("scope_user_ids", expanding=True)))
+    if by_user:
+        stmt = stmt.where(Task.user_id == bindparam("user_id"))
+    if by_project:
+        stmt = stmt.where(Task.project_id == bindparam("project_id"))
+    if by_type:
+        stmt = stmt.where(Task.task_type == bindparam("task_type"))
+    if by_status:
+        stmt = stmt.where(Task.status == bindparam("status"))
+    if by_date:
+        stmt = stmt.where(Task.date.between(bindparam("from_date"), bindparam("to_date")))
+    if by_search:
         stmt = stmt.where(or_(
-            Task.task_title.ilike(f"%{search}%"),
-            Task.task_details.ilike(f"%{search}%")
+            Task.task_title.ilike(bindparam("search")),
+            Task.task_details.ilike(bindparam("search"))
         ))
 
-    if filters.only_backdated:
+    if backdated_mode is not None:
         stmt = stmt.where(Task.is_backdated == True)
-        if filters.filter_backdated_by_creator_type == "own":
+        if backdated_mode == "own":
             stmt = stmt.where(Task.user_id == Task.created_by)
-        elif filters.filter_backdated_by_creator_type == "manager":
+        elif backdated_mode == "manager":
             stmt = stmt.where(Task.user_id != Task.created_by)
     else:
         stmt = stmt.where(or_(
@@ -189,8 +251,57 @@ async def list_tasks(filters: schemas.TaskFilterRequest, db: AsyncSession, curre
             Task.is_approved == True
         ))
 
-    stmt = stmt.order_by(Task.start_time.desc()).offset((page - 1) * page_size).limit(page_size)
-    result = await db.execute(stmt)
+    stmt = stmt.order_by(Task.start_time.desc())
+    if paged:
+        stmt = stmt.offset(bindparam("offset", type_=Integer)).limit(bindparam("limit", type_=Integer))
+    return stmt
+
+
+async def build_task_query(filters: schemas.TaskFilterRequest, db: AsyncSession, current_user: User, search: Optional[str], base=None, paged: bool = False):
+    """Role-scoped, filtered task query as (statement, parameters), newest first."""
+    user_ids = await visible_user_ids(db, current_user)
+    params = {}
+    if user_ids is not None:
+        params["scope_user_ids"] = user_ids
+    if filters.user_id:
+        params["user_id"] = filters.user_id
+    if filters.project_id:
+        params["project_id"] = filters.project_id
+    if filters.task_type:
+        params["task_type"] = filters.task_type
+    if filters.status:
+        params["status"] = filters.status
+    if filters.from_date and filters.to_date:
+        params["from_date"] = filters.from_date
+        params["to_date"] = filters.to_date
+    if search:
+        params["search"] = f"%{search}%"
+
+    stmt = _task_query(
+        base,
+        "scope_user_ids" in params,
+        "user_id" in params,
+        "project_id" in params,
+        "task_type" in params,
+        "status" in params,
+        "from_date" in params,
+        "search" in params,
+        filters.filter_backdated_by_creator_type if filters.only_backdated else None,
+        paged,
+    )
+    return stmt, params
+
+
+async def list_tasks(filters: schemas.TaskFilterRequest, db: AsyncSession, current_user: User, page: int, page_size: int, search: Optional[str], fields: Optional[str] = None) -> List[Task]:
+    columns = select_columns(Task, fields, TASK_FIELDS)
+    base = tuple(column.key for column in columns) if columns else None
+    stmt, params = await build_task_query(filters, db, current_user, search, base, paged=True)
+
+    params["offset"] = (page - 1) * page_size
+    params["limit"] = page_size
+    result = await db.execute(stmt, params)
+    if columns:
+        return [dict(row) for row in result.mappings()]
     return result.scalars().all()
 
 
@@ -203,11 +314,15 @@ async def approve_task(task_id: int, db: AsyncSession) -> Task:
     if task.status != TaskStatusEnum.ToBeApproved:
         raise HTTPException(status_code=400, detail="Only tasks in 'To Be Approved' status can be approved")
 
+    before = snapshot(task)
     task.status = TaskStatusEnum.Approved
     task.is_approved = True
 
     await db.commit()
     await db.refresh(task)
+    after = snapshot(task)
+    reviewer_balancer.task_changed(before, after)
+    audit_log.record(task.tenant_id, task.id, task.user_id, None, "approve", diff(before, after))
     return task
 
 
@@ -221,7 +336,7 @@ async def edit_task(task_id: int, updated_data: schemas.TaskUpdate, db: AsyncSes
     if current_user.role in [RoleEnum.Employee, RoleEnum.TL]:
         raise HTTPException(status_code=403, detail="Permission denied")
 
-    updates = updated_data.dict(exclude_unset=True)
+    updates = updated_data.dict(exclude_unset=True, exclude={"auto_assign_reviewer"})
 
     # Do not allow start_time update for non-backdated
     if not task.is_backdated and "start_time" in updates:
@@ -231,6 +346,16 @@ async def edit_task(task_id: int, updated_data: schemas.TaskUpdate, db: AsyncSes
     if "reviewer_id" in updates and updates["reviewer_id"] == task.user_id:
         raise HTTPException(status_code=400, detail="Reviewer cannot be the same as the user")
 
+    await check_references(db, updates.get("project_id"), [updates.get("reviewer_id"), updates.get("user_id")])
+
+    if updated_data.auto_assign_reviewer and updates.get("reviewer_id") is None:
+        owner_id = updates.get("user_id", task.user_id)
+        owner_result = await db.execute(select(User).where(User.id == owner_id))
+        owner = owner_result.scalar_one_or_none()
+        if not owner:
+            raise HTTPException(status_code=404, detail="User not found")
+        updates["reviewer_id"] = reviewer_balancer.pick(owner.reporting_manager, owner.id)
+
     # Convert datetime fields to UTC
     if "start_time" in updates:
         updates["start_time"] = ensure_utc(updates["start_time"])
@@ -243,14 +368,16 @@ async def edit_task(task_id: int, updated_data: schemas.TaskUpdate, db: AsyncSes
     if start_time and end_time and end_time < start_time:
         raise HTTPException(status_code=400, detail="End time cannot be before start time")
 
+    before = snapshot(task)
     for key, value in updates.items():
         setattr(task, key, value)
 
-    if task.start_time and task.end_time:
-        task.total_time_minutes = round((task.end_time - task.start_time).total_seconds() / 60, 2)
-
     await db.commit()
     await db.refresh(task)
+    live_feed.publish_task(task)
+    after = snapshot(task)
+    reviewer_balancer.task_changed(before, after)
+    audit_log.record(task.tenant_id, task.id, task.user_id, current_user.id, "edit", diff(before, after))
     return task
 
 
@@ -263,11 +390,190 @@ async def delete_task(task_id: int, db: AsyncSession, current_user: User):
     if task.created_by != current_user.id:
         raise HTTPException(status_code=403, detail="You can only delete your own task.")
 
+    before = snapshot(task)
+    db.add(TaskTombstone(task_id=task.id, user_id=task.user_id, date=task.date))
     await db.delete(task)
     await db.commit()
+    live_feed.remove_task(task_id)
+    reviewer_balancer.task_changed(before, None)
+    audit_log.record(current_user.tenant_id, task_id, before["user_id"], current_user.id, "delete", diff(before, None))
     return {"detail": "Task deleted"}
 
 
+def _encode_sync_cursor(since: Optional[datetime], started: datetime, task: Task) -> str:
+    payload = {
+        "s": since.isoformat() if since else None,
+        "t": started.isoformat(),
+        "u": task.updated_at.isoformat(),
+        "i": task.id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode()
+
+
+def _decode_sync_cursor(cursor: str):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        since = ensure_utc(datetime.fromisoformat(payload["s"])) if payload["s"] else None
+        return since, ensure_utc(datetime.fromisoformat(payload["t"])), ensure_utc(datetime.fromisoformat(payload["u"])), int(payload["i"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def get_task_changes(since: Optional[datetime], db: AsyncSession, current_user: User, limit: int, cursor: Optional[str] = None) -> dict:
+    """One page of tasks changed since `since`, in (updated_at, id) order.
+
+    While `has_more` is set, the client passes `next_cursor` back to get the
+    next page; the cursor carries the original `since`, so every page of one
+    sync makes the same full-resync decision. The returned watermark is only
+    meant to be stored once the last page has been read.
+    """
+    after = None
+    if cursor:
+        since, started, after_updated_at, after_id = _decode_sync_cursor(cursor)
+        after = (after_updated_at, after_id)
+    else:
+        since, started = ensure_utc(since), datetime.now(timezone.utc)
+
+    # Tombstones are pruned after the retention window, so older watermarks
+    # cannot be served incrementally and the client must reload everything.
+    full_resync = since is None or since < started - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+    user_ids = await visible_user_ids(db, current_user)
+
+    stmt = select(Task)
+    if user_ids is not None:
+        stmt = stmt.where(Task.user_id.in_(user_ids))
+    if not full_resync:
+        stmt = stmt.where(Task.updated_at >= since)
+    if after:
+        # Keyset on (updated_at, id): rows sharing one timestamp still page through.
+        stmt = stmt.where(tuple_(Task.updated_at, Task.id) > tuple_(*after))
+    stmt = stmt.order_by(Task.updated_at, Task.id).limit(limit + 1)
+    result = await db.execute(stmt)
+    tasks = result.scalars().all()
+
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    # Deletions are reported once, with the first page.
+    deleted_ids = []
+    if not full_resync and not cursor:
+        tomb_stmt = select(TaskTombstone.task_id).where(TaskTombstone.deleted_at >= since)
+        if user_ids is not None:
+            tomb_stmt = tomb_stmt.where(TaskTombstone.user_id.in_(user_ids))
+        tomb_result = await db.execute(tomb_stmt)
+        deleted_ids = list(tomb_result.scalars().all())
+
+    return {
+        "tasks": tasks,
+        "deleted_ids": deleted_ids,
+        # updated_at is stamped before commit, so rows committed just after the
+        # first page's query can carry an older timestamp; step back to pick
+        # them up next time.
+        "watermark": started - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS),
+        "has_more": has_more,
+        "next_cursor": _encode_sync_cursor(since, started, tasks[-1]) if has_more else None,
+        "full_resync": full_resync,
+    }
+
+
+async def get_task_history(task_id: int, db: AsyncSession, current_user: User) -> List[TaskAuditLog]:
+    stmt = select(TaskAuditLog).where(TaskAuditLog.task_id == task_id)
+    user_ids = await visible_user_ids(db, current_user)
+    if user_ids is not None:
+        stmt = stmt.where(TaskAuditLog.user_id.in_(user_ids))
+    result = await db.execute(stmt.order_by(TaskAuditLog.created_at, TaskAuditLog.id))
+    entries = list(result.scalars().all())
+    # Entries still in this process's write buffer; other workers' appear
+    # after their next scheduled flush. A batch committing during the query
+    # can show up in both.
+    written = {(e.created_at, e.action) for e in entries}
+    entries += [
+        e for e in audit_log.pending(session_tenant_id(db), task_id)
+        if (user_ids is None or e.user_id in user_ids) and (e.created_at, e.action) not in written
+    ]
+    if not entries:
+        raise HTTPException(status_code=404, detail="No history found for this task")
+    return entries
+
+
+async def prune_task_tombstones():
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(TaskTombstone).where(TaskTombstone.deleted_at < cutoff))
+        await db.commit()
+
+
+# Same formula as the tasks_total_time_minutes trigger.
+_expected_minutes = cast(
+    func.round(cast(func.extract("epoch", Task.end_time - Task.start_time) / 60, Numeric), 2), Float
+)
+# Stored rows may predate the trigger and carry Python-rounded floats, hence the tolerance.
+_duration_mismatch = or_(
+    Task.total_time_minutes.is_(None) != _expected_minutes.is_(None),
+    func.abs(Task.total_time_minutes - _expected_minutes) > 0.005,
+)
+
+
+@lru_cache(maxsize=None)
+def _duration_check_query(tenant_scoped: bool):
+    chunk = select(Task.id, _duration_mismatch.label("mismatch")).where(Task.id > bindparam("last_id"))
+    if tenant_scoped:
+        chunk = chunk.where(Task.tenant_id == bindparam("tenant_id"))
+    chunk = chunk.order_by(Task.id).limit(bindparam("batch_size", type_=Integer)).subquery()
+    return select(func.max(chunk.c.id), func.count(), func.array_agg(chunk.c.id).filter(chunk.c.mismatch))
+
+
+async def verify_task_durations(repair: bool = False, batch_size: Optional[int] = None, tenant_id: Optional[int] = None) -> dict:
+    """Scan tasks in id order and report (or fix) rows whose total_time_minutes drifted.
+
+    Covers every tenant unless `tenant_id` is given. Repairs rewrite end_time
+    to itself so the trigger recomputes the total.
+    """
+    batch_size = batch_size or settings.DURATION_CHECK_BATCH_SIZE
+    report = {"scanned": 0, "mismatched": 0, "repaired": 0, "sample_ids": []}
+    stmt = _duration_check_query(tenant_id is not None)
+    last_id = 0
+    while True:
+        # One short transaction per chunk.
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(stmt, {"last_id": last_id, "batch_size": batch_size, "tenant_id": tenant_id})
+            max_id, count, mismatched_ids = result.one()
+            if not count:
+                break
+            mismatched_ids = mismatched_ids or []
+            if repair and mismatched_ids:
+                await db.execute(
+                    update(Task).where(Task.id.in_(mismatched_ids)).values(end_time=Task.end_time)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                report["repaired"] += len(mismatched_ids)
+
+        report["scanned"] += count
+        report["mismatched"] += len(mismatched_ids)
+        room = settings.DURATION_CHECK_MAX_REPORTED_IDS - len(report["sample_ids"])
+        report["sample_ids"].extend(mismatched_ids[:max(room, 0)])
+        last_id = max_id
+        if count < batch_size:
+            break
+    return report
+
+
+def duration_check_slot(now: Optional[datetime] = None) -> datetime:
+    """Start of the current check interval (a UTC day by default)."""
+    interval = settings.DURATION_CHECK_INTERVAL_SECONDS
+    now = now or datetime.now(timezone.utc)
+    return datetime.fromtimestamp(now.timestamp() // interval * interval, timezone.utc)
+
+
+async def run_scheduled_duration_check() -> Optional[dict]:
+    # Every worker wakes up each interval; only the first one scans.
+    if not await claim_run("verify_task_durations", duration_check_slot()):
+        return None
+    return await verify_task_durations(repair=settings.DURATION_CHECK_AUTO_REPAIR)
+
+
 async def download_task_report(filters: schemas.TaskFilterRequest, db: AsyncSession, current_user: User, search: Optional[str] = None):
     tasks = await list_tasks(filters, db, current_user, page=1, page_size=10000, search=search)
 
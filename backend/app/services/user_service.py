@@ -1,10 +1,71 @@
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
+from typing import List, Optional, Set
 from app import models, schemas
+from app.config import settings
 from app.utils.auth import hash_password
+from app.utils.fields import select_columns
+from app.utils.cache import Cache, invalidation_bus
 from sqlalchemy import func
+import pytz
+
+USER_FIELDS = [
+    "id", "employee_code", "name", "username", "email", "department",
+    "reporting_manager", "tl", "role", "is_active", "timezone",
+    "notification_preference",
+]
+
+# Authenticated users by id, as column dicts (get_current_user).
+user_cache = Cache("users", invalidation_bus, settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_ENTRIES)
+# "<role>:<user id>" -> ids visible to that user (task_service.visible_user_ids).
+hierarchy_cache = Cache("hierarchy", invalidation_bus, settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_ENTRIES)
+
+# User fields that place a user in teams; edits to anything else (name,
+# password, email, preferences) leave every team and visibility list alone.
+TEAM_FIELDS = ("role", "tl", "reporting_manager", "is_active", "department")
+
+
+def _team_state(user: models.User) -> dict:
+    return {field: getattr(user, field) for field in ("id",) + TEAM_FIELDS}
+
+
+def _hierarchy_keys(before: Optional[dict], after: Optional[dict]) -> Set[str]:
+    """hierarchy_cache keys a user write can change; None means no row.
+
+    A TL's list holds the users whose `tl` is that TL and a manager's those
+    whose `reporting_manager` is that manager, so only moves in or out of a
+    list (and the user's own list, on a role change or delete) matter.
+    """
+    keys = set()
+    states = [state for state in (before, after) if state]
+    for field, role in (("role", None), ("tl", "TL"), ("reporting_manager", "Manager")):
+        if before and after and before[field] == after[field]:
+            continue
+        for state in states:
+            if role is None:
+                keys.add(f"{state['role'].name}:{state['id']}")
+            elif state[field] is not None:
+                keys.add(f"{role}:{state[field]}")
+    return keys
+
+
+async def _teams_changed(before: Optional[dict], after: Optional[dict]):
+    """Invalidate what a user create/update/delete affects; None means no row."""
+    if before == after:
+        return
+    for key in sorted(_hierarchy_keys(before, after)):
+        await hierarchy_cache.invalidate(key)
+    # One message per change for consumers that rebuild whole teams.
+    await invalidation_bus.publish("teams", (after or before)["id"])
+    # Only an existing user's move re-attributes logged time.
+    if before and (after is None or before["department"] != after["department"]):
+        await invalidation_bus.publish("user_department", before["id"])
+
+
+def validate_timezone(tz_name: str):
+    if tz_name not in pytz.all_timezones_set:
+        raise HTTPException(status_code=400, detail=f"Unknown timezone '{tz_name}'")
 
 
 async def create_user(data: schemas.UserCreate, db: AsyncSession):
@@ -21,6 +82,8 @@ async def create_user(data: schemas.UserCreate, db: AsyncSession):
         if existing_email.scalar_one_or_none():
             raise HTTPException(status_code=400, detail="Email already exists")
 
+    validate_timezone(data.timezone)
+
     max_code_result = await db.execute(select(func.max(models.User.employee_code)))
     max_code = max_code_result.scalar() or 1000  # Start from 1001
     new_code = max_code + 1
@@ -35,15 +98,19 @@ async def create_user(data: schemas.UserCreate, db: AsyncSession):
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    await _teams_changed(None, _team_state(new_user))
     return new_user
 
-async def get_users(db: AsyncSession, role: Optional[schemas.RoleEnum] = None, active: Optional[bool] = None):
-    query = select(models.User)
+async def get_users(db: AsyncSession, role: Optional[schemas.RoleEnum] = None, active: Optional[bool] = None, fields: Optional[str] = None):
+    columns = select_columns(models.User, fields, USER_FIELDS)
+    query = select(*columns) if columns else select(models.User)
     if role:
         query = query.filter(models.User.role == role)
     if active is not None:
         query = query.filter(models.User.is_active == active)
     result = await db.execute(query)
+    if columns:
+        return [dict(row) for row in result.mappings()]
     return result.scalars().all()
 
 async def get_user_by_id(user_id: int, db: AsyncSession):
@@ -56,20 +123,28 @@ async def get_user_by_id(user_id: int, db: AsyncSession):
 
 async def update_user(user_id: int, updates: schemas.UserUpdate, db: AsyncSession):
     user = await get_user_by_id(user_id, db)
+    before = _team_state(user)
 
     update_data = updates.dict(exclude_unset=True)
     if "password" in update_data:
         update_data["password"] = hash_password(update_data["password"])
+    if "timezone" in update_data:
+        validate_timezone(update_data["timezone"])
     for key, value in update_data.items():
         setattr(user, key, value)
 
     await db.commit()
     await db.refresh(user)
+    await user_cache.invalidate(user_id)
+    await _teams_changed(before, _team_state(user))
     return user
 
 
 async def delete_user(user_id: int, db: AsyncSession):
     user = await get_user_by_id(user_id, db)
+    before = _team_state(user)
     await db.delete(user)
     await db.commit()
+    await user_cache.invalidate(user_id)
+    await _teams_changed(before, None)
     return user
@@ -29,7 +29,8 @@ def create_access_token(user: User, expires_delta: timedelta = None):
     to_encode = {
         "sub": str(user.id),
         "username": user.username,
-        "role": user.role.value
+        "role": user.role.value,
+        "tid": user.tenant_id,
     }
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
     to_encode.update({"exp": expire})
@@ -0,0 +1,276 @@
+import asyncio
+import inspect
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+# Invalidating this key clears the whole namespace.
+ALL = "*"
+
+_MISSING = object()
+
+Handler = Callable[[str], Any]
+
+
+class InvalidationBus:
+    """Fans cache invalidations out to every worker process.
+
+    `publish` runs the local handlers immediately and then forwards the
+    message; each backend drops messages that came from its own process, so
+    handlers run exactly once per process. Handlers may be coroutines, in
+    which case they are scheduled rather than awaited.
+    """
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, namespace: str, handler: Handler):
+        self._handlers.setdefault(namespace, []).append(handler)
+
+    def dispatch(self, namespace: str, key: str):
+        for handler in self._handlers.get(namespace, ()):
+            try:
+                result = handler(key)
+                if inspect.isawaitable(result):
+                    asyncio.ensure_future(result)
+            except Exception:
+                logger.exception("Cache invalidation handler failed for %s:%s", namespace, key)
+
+    def dispatch_all(self):
+        """Clear everything, e.g. after missing messages while disconnected."""
+        for namespace in list(self._handlers):
+            self.dispatch(namespace, ALL)
+
+    def _encode(self, namespace: str, key: str) -> str:
+        return json.dumps({"o": self.origin, "n": namespace, "k": key}, separators=(",", ":"))
+
+    def _receive(self, payload: str):
+        message = json.loads(payload)
+        if message["o"] != self.origin:
+            self.dispatch(message["n"], message["k"])
+
+    async def publish(self, namespace: str, key: Any = ALL, local: bool = True):
+        """`local=False` when the caller has already updated this process's state."""
+        key = str(key)
+        if local:
+            self.dispatch(namespace, key)
+        try:
+            await self._send(self._encode(namespace, key))
+        except Exception:
+            # Other workers fall back to their TTLs; never fail the request.
+            logger.exception("Failed to broadcast cache invalidation %s:%s", namespace, key)
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def _send(self, payload: str):
+        pass
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """LISTEN/NOTIFY on a connection held from the application's asyncpg pool."""
+
+    def __init__(self, engine, channel: str):
+        super().__init__()
+        self.engine = engine
+        self.channel = channel
+        self._conn = None
+        self._driver = None
+        self._lock = asyncio.Lock()
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    async def _connect(self):
+        self._conn = await self.engine.connect()
+        raw = await self._conn.get_raw_connection()
+        self._driver = raw.driver_connection
+        await self._driver.add_listener(self.channel, self._on_notify)
+        self._driver.add_termination_listener(self._on_terminated)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._receive(payload)
+
+    def _on_terminated(self, connection):
+        self._driver = None
+        if not self._stopping:
+            # Anything published while we were away is lost.
+            self.dispatch_all()
+            self._reconnect_task = asyncio.ensure_future(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1.0
+        while not self._stopping:
+            try:
+                if self._conn is not None:
+                    await self._conn.invalidate()
+                await self._connect()
+                self.dispatch_all()
+                return
+            except Exception:
+                logger.exception("Cache invalidation listener reconnect failed")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+    async def start(self):
+        await self._connect()
+
+    async def stop(self):
+        self._stopping = True
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+        if self._driver is not None:
+            await self._driver.remove_listener(self.channel, self._on_notify)
+        if self._conn is not None:
+            await self._conn.close()
+
+    async def _send(self, payload: str):
+        if self._driver is None:
+            raise ConnectionError("Cache invalidation listener is not connected")
+        # One asyncpg connection runs one statement at a time.
+        async with self._lock:
+            await self._driver.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+
+
+class SQLiteInvalidationBus(InvalidationBus):
+    """Polls a shared SQLite file; for tests and single-host setups without Postgres."""
+
+    def __init__(self, path: str, poll_interval: float):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self._last_id = 0
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def _execute(self, sql: str, params: tuple = ()) -> list:
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    async def start(self):
+        await asyncio.to_thread(
+            self._execute,
+            "CREATE TABLE IF NOT EXISTS cache_invalidations (id INTEGER PRIMARY KEY AUTOINCREMENT, payload TEXT NOT NULL, created_at REAL NOT NULL)",
+        )
+        rows = await asyncio.to_thread(self._execute, "SELECT COALESCE(MAX(id), 0) FROM cache_invalidations")
+        self._last_id = rows[0][0]
+        self._poll_task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                rows = await asyncio.to_thread(
+                    self._execute, "SELECT id, payload FROM cache_invalidations WHERE id > ? ORDER BY id", (self._last_id,)
+                )
+            except sqlite3.Error:
+                logger.exception("Failed to poll cache invalidations")
+                continue
+            for row_id, payload in rows:
+                self._last_id = row_id
+                self._receive(payload)
+
+    async def _send(self, payload: str):
+        now = time.time()
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO cache_invalidations (payload, created_at) VALUES (?, ?)",
+            (payload, now),
+        )
+        # Keep the file small; every poller is at most a few intervals behind.
+        await asyncio.to_thread(self._execute, "DELETE FROM cache_invalidations WHERE created_at < ?", (now - 60,))
+
+
+class Cache:
+    """Per-process LRU cache with a TTL whose evictions go through the bus.
+
+    Invalidations bump a generation counter. Take `version()` before
+    loading a value and pass it to `set`; the value is dropped if the key was
+    invalidated in between, so a slow load cannot re-cache data that an
+    invalidation has already superseded.
+    """
+
+    def __init__(self, namespace: str, bus: InvalidationBus, ttl_seconds: float, max_entries: int):
+        self.namespace = namespace
+        self.bus = bus
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generation = 0
+        # Generation of each key's latest invalidation; keys forgotten to
+        # bound the map are folded into _cleared_at, which only drops more sets.
+        self._invalidated_at: "OrderedDict[str, int]" = OrderedDict()
+        self._cleared_at = 0
+        bus.subscribe(namespace, self._evict)
+
+    def _evict(self, key: str):
+        self._generation += 1
+        if key == ALL:
+            self._entries.clear()
+            self._invalidated_at.clear()
+            self._cleared_at = self._generation
+            return
+        self._entries.pop(key, None)
+        self._invalidated_at[key] = self._generation
+        self._invalidated_at.move_to_end(key)
+        while len(self._invalidated_at) > self.max_entries:
+            _, generation = self._invalidated_at.popitem(last=False)
+            self._cleared_at = max(self._cleared_at, generation)
+
+    def version(self) -> int:
+        return self._generation
+
+    def get(self, key: Any, default=None):
+        key = str(key)
+        entry = self._entries.get(key, _MISSING)
+        if entry is _MISSING:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return default
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Any, value, version: Optional[int] = None):
+        key = str(key)
+        if version is not None and max(self._cleared_at, self._invalidated_at.get(key, 0)) > version:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, key: Any = ALL):
+        await self.bus.publish(self.namespace, key)
+
+
+def create_bus() -> InvalidationBus:
+    if settings.CACHE_BUS_BACKEND == "postgres":
+        return PostgresInvalidationBus(engine, settings.CACHE_BUS_CHANNEL)
+    if settings.CACHE_BUS_BACKEND == "sqlite":
+        return SQLiteInvalidationBus(settings.CACHE_BUS_SQLITE_PATH, settings.CACHE_BUS_POLL_SECONDS)
+    # Single process: local dispatch only.
+    return InvalidationBus()
+
+
+invalidation_bus = create_bus()
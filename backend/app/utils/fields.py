@@ -0,0 +1,21 @@
+from typing import List, Optional
+from fastapi import HTTPException
+
+
+def select_columns(model, fields: Optional[str], allowed: List[str]) -> Optional[list]:
+    """Map a `fields=a,b,c` query value to model columns, always including `id`.
+
+    Returns None when no selection was requested so callers keep loading full
+    entities.
+    """
+    if not fields:
+        return None
+
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    if "id" not in names:
+        names.insert(0, "id")
+    return [getattr(model, name) for name in dict.fromkeys(names)]
@@ -0,0 +1,133 @@
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import Response
+from pydantic import BaseModel
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import IdempotencyKey
+
+# How often a duplicate checks whether the original request has finished.
+POLL_SECONDS = 0.05
+
+
+def _replay(status_code: int, body: str):
+    if status_code >= 400:
+        raise HTTPException(status_code=status_code, detail=json.loads(body))
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+class IdempotencyStore:
+    """Responses keyed by (tenant, endpoint, Idempotency-Key) in the database.
+
+    The first request inserts the key and runs; the unique constraint makes
+    that claim atomic across workers. A duplicate that arrives while the
+    original is still running polls until it finishes instead of repeating
+    the work. Failures with a 5xx (or no) status release the key so the
+    client can retry; 4xx answers are final and replayed like successes.
+    """
+
+    def __init__(self, ttl_seconds: int, lock_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.lock_seconds = lock_seconds
+
+    async def _claim(self, tenant_id: int, endpoint: str, key: str, fingerprint: str) -> Optional[int]:
+        """Insert the key as running; None if an unexpired row already holds it."""
+        now = datetime.now(timezone.utc)
+        values = {
+            "fingerprint": fingerprint, "status_code": None, "body": None,
+            "expires_at": now + timedelta(seconds=self.lock_seconds),
+        }
+        stmt = (
+            insert(IdempotencyKey)
+            .values(tenant_id=tenant_id, endpoint=endpoint, key=key, **values)
+            .on_conflict_do_update(
+                constraint="uq_idempotency_keys_tenant_endpoint_key",
+                set_=values,
+                where=IdempotencyKey.expires_at <= now,
+            )
+            .returning(IdempotencyKey.id)
+        )
+        async with AsyncSessionLocal() as db:
+            claimed = (await db.execute(stmt)).scalar_one_or_none()
+            await db.commit()
+        return claimed
+
+    async def _finish(self, row_id: int, status_code: Optional[int], body: Optional[str]):
+        async with AsyncSessionLocal() as db:
+            if status_code is None:
+                await db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == row_id))
+            else:
+                expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+                await db.execute(
+                    update(IdempotencyKey).where(IdempotencyKey.id == row_id)
+                    .values(status_code=status_code, body=body, expires_at=expires_at)
+                )
+            await db.commit()
+
+    async def _wait(self, tenant_id: int, endpoint: str, key: str, fingerprint: str):
+        stmt = select(IdempotencyKey.fingerprint, IdempotencyKey.status_code, IdempotencyKey.body).where(
+            IdempotencyKey.tenant_id == tenant_id, IdempotencyKey.endpoint == endpoint, IdempotencyKey.key == key,
+        )
+        deadline = asyncio.get_running_loop().time() + self.lock_seconds
+        while True:
+            async with AsyncSessionLocal() as db:
+                row = (await db.execute(stmt)).first()
+            if row is None:
+                raise HTTPException(status_code=409, detail="The original request for this Idempotency-Key failed; retry")
+            if row.fingerprint != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request")
+            if row.status_code is not None:
+                return _replay(row.status_code, row.body)
+            if asyncio.get_running_loop().time() >= deadline:
+                raise HTTPException(status_code=409, detail="The original request for this Idempotency-Key is still running; retry")
+            await asyncio.sleep(POLL_SECONDS)
+
+    async def run(self, tenant_id: int, endpoint: str, key: str, fingerprint: str, func: Callable[[], Awaitable[BaseModel]]):
+        row_id = await self._claim(tenant_id, endpoint, key, fingerprint)
+        if row_id is None:
+            return await self._wait(tenant_id, endpoint, key, fingerprint)
+
+        status_code, body = None, None
+        try:
+            result = await func()
+            status_code, body = 200, result.model_dump_json()
+            return result
+        except HTTPException as exc:
+            # Validation failures are final answers too; replay them as-is.
+            if exc.status_code < 500:
+                status_code, body = exc.status_code, json.dumps(exc.detail)
+            raise
+        finally:
+            # Shielded so a cancelled request still records or releases its key.
+            await asyncio.shield(self._finish(row_id, status_code, body))
+
+    async def prune(self):
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < datetime.now(timezone.utc)))
+            await db.commit()
+
+
+idempotency_store = IdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS)
+
+
+async def run_idempotent(key: Optional[str], tenant_id: int, endpoint: str, payload: str, func: Callable[[], Awaitable[BaseModel]]):
+    """Run `func` once per (tenant, endpoint, Idempotency-Key); without a key just run it."""
+    if not key:
+        return await func()
+    if len(key) > 255:
+        raise HTTPException(status_code=400, detail="Idempotency-Key must be at most 255 characters")
+    fingerprint = hashlib.sha256(payload.encode()).hexdigest()
+    return await idempotency_store.run(tenant_id, endpoint, key, fingerprint, func)
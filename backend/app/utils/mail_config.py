@@ -1,5 +1,13 @@
+import logging
+from email.utils import formataddr
+from typing import List, Tuple
+from aiosmtplib import SMTPException
 from app.config import settings
 from fastapi_mail import FastMail, ConnectionConfig, MessageSchema, MessageType
+from fastapi_mail.connection import Connection
+from fastapi_mail.msg import MailMsg
+
+logger = logging.getLogger(__name__)
 
 conf = ConnectionConfig(
     MAIL_USERNAME=settings.EMAIL_USER,
@@ -24,3 +32,30 @@ async def send_email_async(subject: str, email_to: str, body: str):
         subtype=MessageType.plain
     )
     await fast_mail.send_message(message)
+
+
+async def send_email_batch_async(messages: List[Tuple[str, str, str]]) -> int:
+    """Send (subject, email_to, body) messages over one SMTP connection.
+
+    A rejected recipient is logged and skipped; returns the number sent.
+    """
+    if not messages:
+        return 0
+    sender = formataddr((conf.MAIL_FROM_NAME, conf.MAIL_FROM))
+    sent = 0
+    # FastMail.send_message opens a connection per message; reusing one relies
+    # on fastapi-mail internals, hence the exact pin in requirements.txt.
+    async with Connection(conf) as connection:
+        for subject, email_to, body in messages:
+            message = MessageSchema(
+                subject=subject,
+                recipients=[email_to],
+                body=body,
+                subtype=MessageType.plain
+            )
+            try:
+                await connection.session.send_message(await MailMsg(message)._message(sender))
+                sent += 1
+            except SMTPException:
+                logger.exception("Failed to send digest email to %s", email_to)
+    return sent
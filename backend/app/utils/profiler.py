@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from jose import jwt, JWTError
+from pyinstrument import Profiler
+from sqlalchemy import event
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import settings
+
+
+class SqlStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+
+_sql_stats: ContextVar[Optional[SqlStats]] = ContextVar("profiler_sql_stats", default=None)
+
+
+def install_sql_timing(engine):
+    """Attribute cursor execution time to the profiled request running it."""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if _sql_stats.get() is not None:
+            conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = _sql_stats.get()
+        starts = conn.info.get("profiler_query_start")
+        if stats is not None and starts:
+            stats.count += 1
+            stats.seconds += time.perf_counter() - starts.pop()
+
+
+def _service_breakdown(frame, totals: dict):
+    # Top-most frames inside app/services, so nested service calls are not double counted.
+    path = (frame.file_path or "").replace("\\", "/")
+    if "/app/services/" in path:
+        name = f"{os.path.splitext(os.path.basename(path))[0]}.{frame.function}"
+        totals[name] = totals.get(name, 0.0) + frame.time
+        return
+    for child in frame.children:
+        _service_breakdown(child, totals)
+
+
+class ProfileStore:
+    """Profiles as JSON files on local disk, keeping only the newest `max_files`.
+
+    Each record carries the requesting tenant, and reads are filtered by it.
+    """
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = directory
+        self.max_files = max_files
+
+    def _files(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(f for f in os.listdir(self.directory) if f.endswith(".json"))
+
+    def save(self, record: dict, report: str):
+        os.makedirs(self.directory, exist_ok=True)
+        filename = f"{int(time.time() * 1000)}-{record['id']}.json"
+        with open(os.path.join(self.directory, filename), "w") as f:
+            json.dump({**record, "report": report}, f)
+
+        files = self._files()
+        for old in files[:max(len(files) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except FileNotFoundError:
+                pass
+
+    def _load(self, filename: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.directory, filename)) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def slowest(self, limit: int, tenant_id: int) -> List[dict]:
+        records = [r for r in (self._load(f) for f in self._files()) if r and r.get("tenant_id") == tenant_id]
+        records.sort(key=lambda r: r["duration_ms"], reverse=True)
+        return records[:limit]
+
+    def get(self, profile_id: str, tenant_id: int) -> Optional[dict]:
+        for filename in self._files():
+            if filename.endswith(f"-{profile_id}.json"):
+                record = self._load(filename)
+                return record if record and record.get("tenant_id") == tenant_id else None
+        return None
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+
+def _token_claims(headers: Headers) -> dict:
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return {}
+    try:
+        return jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+    except JWTError:
+        return {}
+
+
+class ProfilerMiddleware:
+    """Statistical profile of single requests, opt-in per request.
+
+    A request is profiled when an admin sends `X-Profile: 1`, or at random with
+    probability PROFILE_SAMPLE_RATE. Profiled responses carry `X-Profile-Id`.
+    """
+
+    def __init__(self, app, sample_rate: float = 0.0, interval: float = 0.001):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.interval = interval
+
+    def _should_profile(self, headers: Headers) -> bool:
+        if headers.get("x-profile") == "1" and _token_claims(headers).get("role") == "Admin":
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(Headers(scope=scope)):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        # Profiles are only shown to admins of the tenant that made the request.
+        tenant_id = _token_claims(Headers(scope=scope)).get("tid")
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(raw=message["headers"])["X-Profile-Id"] = profile_id
+            await send(message)
+
+        stats = SqlStats()
+        token = _sql_stats.set(stats)
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            session = profiler.stop()
+            duration = time.perf_counter() - started
+            _sql_stats.reset(token)
+
+            services = {}
+            root = session.root_frame()
+            if root is not None:
+                _service_breakdown(root, services)
+
+            record = {
+                "id": profile_id,
+                "tenant_id": tenant_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status_code": status_code,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round(duration * 1000, 2),
+                "sql_ms": round(stats.seconds * 1000, 2),
+                "sql_count": stats.count,
+                "python_ms": round(max(duration - stats.seconds, 0.0) * 1000, 2),
+                "services": {name: round(t * 1000, 2) for name, t in services.items()},
+            }
+            await asyncio.to_thread(profile_store.save, record, profiler.output_text(unicode=True))
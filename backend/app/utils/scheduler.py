@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Union
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import AsyncSessionLocal
+from app.models import ScheduledRun
+
+logger = logging.getLogger(__name__)
+
+Interval = Union[float, Callable[[], float]]
+
+
+class PeriodicJob:
+    """Runs an async callable forever, sleeping `interval` seconds between runs.
+
+    `interval` may be a callable so jobs can compute their next wake-up time
+    (e.g. "next Monday 09:00") instead of using a fixed period.
+    """
+
+    def __init__(self, name: str, func: Callable[[], Awaitable[None]], interval: Interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self._task: asyncio.Task = None
+
+    def next_delay(self) -> float:
+        delay = self.interval() if callable(self.interval) else self.interval
+        return max(float(delay), 0.0)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.next_delay())
+            try:
+                await self.func()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A failing run must not kill the loop; the next tick retries.
+                logger.exception("Scheduled job %s failed", self.name)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=f"job:{self.name}")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+
+async def claim_run(name: str, slot: datetime) -> bool:
+    """Record that job `name` runs for `slot`; False if a worker already has.
+
+    Every worker schedules the same jobs, so jobs with visible side effects
+    claim their slot first and the rest of the workers skip it.
+    """
+    stmt = (
+        insert(ScheduledRun)
+        .values(name=name, slot=slot)
+        .on_conflict_do_update(
+            index_elements=[ScheduledRun.name],
+            set_={"slot": slot, "claimed_at": datetime.now(slot.tzinfo)},
+            where=ScheduledRun.slot < slot,
+        )
+        .returning(ScheduledRun.name)
+    )
+    async with AsyncSessionLocal() as db:
+        claimed = (await db.execute(stmt)).first() is not None
+        await db.commit()
+    return claimed
+
+
+class Scheduler:
+    """In-process registry of periodic jobs started/stopped with the app."""
+
+    def __init__(self):
+        self.jobs: Dict[str, PeriodicJob] = {}
+
+    def add(self, job: PeriodicJob):
+        self.jobs[job.name] = job
+
+    def start(self):
+        for job in self.jobs.values():
+            job.start()
+
+    async def stop(self):
+        for job in self.jobs.values():
+            await job.stop()
+
+
+scheduler = Scheduler()
@@ -0,0 +1,176 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+from jose import jwt, JWTError
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, with_loader_criteria
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Tenant, TenantMixin
+from app.utils.cache import ALL, Cache, invalidation_bus
+
+# Tenants by id as column dicts; also consulted for budgets on every request.
+tenant_cache = Cache("tenants", invalidation_bus, settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_ENTRIES)
+
+def session_tenant_id(db: AsyncSession) -> Optional[int]:
+    return db.info.get("tenant_id")
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_tenant(execute_state):
+    """Add `tenant_id = <session tenant>` to every ORM select/update/delete.
+
+    Sessions without a tenant (scheduler jobs, startup) see every tenant.
+    """
+    tenant_id = execute_state.session.info.get("tenant_id")
+    if tenant_id is None or execute_state.is_insert:
+        return
+    if isinstance(execute_state.statement, StatementLambdaElement):
+        # Options added to a lambda_stmt are cached with it, freezing the
+        # first execution's bound values into every later one.
+        raise TypeError("lambda_stmt cannot be used in a tenant-scoped session")
+    # Already covered: the criteria option propagates to these loads.
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(TenantMixin, lambda cls: cls.tenant_id == tenant_id, include_aliases=True)
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_tenant(session, flush_context, instances):
+    tenant_id = session.info.get("tenant_id")
+    for obj in session.new:
+        if isinstance(obj, TenantMixin) and obj.tenant_id is None:
+            if tenant_id is None:
+                raise ValueError(f"Cannot insert {type(obj).__name__} without a tenant")
+            obj.tenant_id = tenant_id
+
+
+async def ensure_default_tenant() -> int:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(Tenant.id).where(Tenant.slug == settings.DEFAULT_TENANT_SLUG))
+        tenant_id = result.scalar_one_or_none()
+        if tenant_id is None:
+            tenant = Tenant(slug=settings.DEFAULT_TENANT_SLUG, name=settings.DEFAULT_TENANT_NAME)
+            db.add(tenant)
+            await db.commit()
+            tenant_id = tenant.id
+    return tenant_id
+
+
+async def get_tenant(tenant_id: int) -> Optional[dict]:
+    tenant = tenant_cache.get(tenant_id)
+    if tenant is None:
+        version = tenant_cache.version()
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(select(Tenant).where(Tenant.id == tenant_id))
+            row = result.scalar_one_or_none()
+        if row is None:
+            return None
+        tenant = {c.key: getattr(row, c.key) for c in Tenant.__mapper__.column_attrs}
+        tenant_cache.set(tenant_id, tenant, version)
+    return tenant
+
+
+async def get_tenant_by_slug(slug: str, db: AsyncSession) -> Tenant:
+    result = await db.execute(select(Tenant).where(Tenant.slug == slug))
+    tenant = result.scalar_one_or_none()
+    if not tenant or not tenant.is_active:
+        raise HTTPException(status_code=404, detail="Organisation not found")
+    return tenant
+
+
+def tenant_from_request(request: Request) -> int:
+    """Tenant from the bearer token's `tid` claim.
+
+    The token is only decoded here; get_current_user still validates it and
+    rejects users outside this tenant. Requests without a usable token are
+    rejected rather than run against some default tenant; /auth/login picks
+    its tenant from the request body instead.
+    """
+    credentials_exception = HTTPException(
+        status_code=401, detail="Could not validate credentials", headers={"WWW-Authenticate": "Bearer"}
+    )
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        return int(payload["tid"])
+    except (JWTError, KeyError, TypeError, ValueError):
+        raise credentials_exception
+
+
+class TenantBudget:
+    """Concurrent-session cap plus a token-bucket request rate for one tenant."""
+
+    def __init__(self, max_concurrent: int, per_minute: int):
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.refill_per_second = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_per_second)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+_budgets: Dict[int, TenantBudget] = {}
+
+
+def _budget(tenant: dict) -> TenantBudget:
+    budget = _budgets.get(tenant["id"])
+    if budget is None:
+        budget = TenantBudget(
+            tenant["max_concurrent_sessions"] or settings.TENANT_MAX_CONCURRENT_SESSIONS,
+            tenant["requests_per_minute"] or settings.TENANT_REQUESTS_PER_MINUTE,
+        )
+        _budgets[tenant["id"]] = budget
+    return budget
+
+
+def _forget_budget(key: str):
+    # Budgets are rebuilt from the updated tenant row on next use.
+    if key == ALL:
+        _budgets.clear()
+    else:
+        _budgets.pop(int(key), None)
+
+
+invalidation_bus.subscribe("tenants", _forget_budget)
+
+
+@asynccontextmanager
+async def tenant_session(tenant_id: int):
+    """A session scoped to `tenant_id`, within that tenant's budgets."""
+    tenant = await get_tenant(tenant_id) if tenant_id is not None else None
+    if not tenant or not tenant["is_active"]:
+        raise HTTPException(status_code=403, detail="Organisation is not active")
+
+    budget = _budget(tenant)
+    if not budget.take():
+        raise HTTPException(status_code=429, detail="Organisation request rate exceeded", headers={"Retry-After": "1"})
+    try:
+        await asyncio.wait_for(budget.semaphore.acquire(), settings.TENANT_SESSION_ACQUIRE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=503, detail="Organisation connection budget exhausted", headers={"Retry-After": "1"})
+    try:
+        async with AsyncSessionLocal() as session:
+            session.info["tenant_id"] = tenant_id
+            yield session
+    finally:
+        budget.semaphore.release()
@@ -0,0 +1,123 @@
+"""Latency of the expected-vs-logged hours report for 1,000 users over a quarter.
+
+Seeds 1,000 active users across every department, two finished tasks per
+user per working day of Q1 2026 (plus breaks and unapproved backdated tasks
+the report must skip) and a holiday, then times hours_report as a request
+runs it: through a tenant session and validated into HoursReportOut. Reports
+the median of several runs for an admin (every user) and for a manager whose
+scope lists all 1,000 ids. The target is under one second.
+
+Needs a scratch Postgres database: every table in it is dropped and recreated.
+
+    cd backend && BENCH_DATABASE_URL=postgresql://... python benchmarks/hours_report.py
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+for name, value in {
+    "EMAIL_HOST": "localhost", "EMAIL_USER": "a@example.com", "EMAIL_PASSWORD": "x",
+    "jwt_secret_key": "x", "jwt_algorithm": "HS256", "jwt_expire_minutes": "60", "CACHE_BUS_BACKEND": "none",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import schemas  # noqa: E402
+from app.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models import (  # noqa: E402
+    SCHEMA_UPGRADE_DDL, TASK_DURATION_DDL, DepartmentEnum, Holiday, Project, RoleEnum, Task, TaskStatusEnum, TaskTypeEnum, User,
+)
+from app.services.calendar_service import hours_report  # noqa: E402
+from app.utils.tenancy import ensure_default_tenant  # noqa: E402
+
+USERS = 1000
+FROM_DATE, TO_DATE = date(2026, 1, 1), date(2026, 3, 31)
+RUNS = 10
+TARGET_SECONDS = 1.0
+
+
+async def seed() -> tuple:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for ddl in SCHEMA_UPGRADE_DDL + TASK_DURATION_DDL:
+            await conn.execute(ddl)
+    tenant_id = await ensure_default_tenant()
+    departments = list(DepartmentEnum)
+    async with AsyncSessionLocal() as db:
+        db.info["tenant_id"] = tenant_id
+        admin = User(employee_code=0, name="Admin", username="admin", password="x",
+                     role=RoleEnum.Admin, department=DepartmentEnum.HR)
+        manager = User(employee_code=1, name="Manager", username="manager", password="x",
+                       role=RoleEnum.Manager, department=DepartmentEnum.IT)
+        project = Project(project_code="P1", project_name="Project")
+        db.add_all([admin, manager, project, Holiday(date=date(2026, 1, 26), name="Holiday")])
+        await db.flush()
+        users = [User(employee_code=i + 2, name=f"User {i}", username=f"user{i}", password="x",
+                      role=RoleEnum.Employee, department=departments[i % len(departments)],
+                      reporting_manager=manager.id) for i in range(USERS)]
+        db.add_all(users)
+        await db.flush()
+        await db.commit()
+
+        days = [FROM_DATE + timedelta(days=i) for i in range((TO_DATE - FROM_DATE).days + 1)]
+        rows = []
+        for n, user in enumerate(users):
+            for day in days:
+                if day.weekday() >= 5:
+                    continue
+                start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+                for offset, minutes, task_type, backdated in (
+                    (0, 200 + n % 60, TaskTypeEnum.Development, False),
+                    (4, 30, TaskTypeEnum.Break, False),
+                    (5, 180, TaskTypeEnum.Testing, n % 10 == 0),
+                ):
+                    begin = start + timedelta(hours=offset)
+                    rows.append({
+                        "tenant_id": tenant_id, "user_id": user.id, "project_id": project.id, "date": day,
+                        "task_title": "Task", "created_by": user.id, "start_time": begin,
+                        "end_time": begin + timedelta(minutes=minutes), "task_type": task_type,
+                        "status": TaskStatusEnum.Done, "is_backdated": backdated, "is_approved": False,
+                    })
+        for i in range(0, len(rows), 20000):
+            await db.execute(insert(Task), rows[i:i + 20000])
+        await db.commit()
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+    print(f"seeded {USERS} users, {len(rows)} tasks")
+    return tenant_id, admin, manager
+
+
+async def measure(label: str, tenant_id: int, current_user: User):
+    timings = []
+    for run in range(RUNS + 1):
+        async with AsyncSessionLocal() as db:
+            db.info["tenant_id"] = tenant_id
+            started = time.perf_counter()
+            report = schemas.HoursReportOut.model_validate(
+                await hours_report(FROM_DATE, TO_DATE, db, current_user)
+            )
+            elapsed = time.perf_counter() - started
+        if run:  # the first run warms connections and caches
+            timings.append(elapsed)
+    assert len(report.users) >= USERS
+    median = statistics.median(timings)
+    verdict = "ok" if median < TARGET_SECONDS else "OVER TARGET"
+    print(f"{label:<28} median {median * 1000:7.1f} ms  max {max(timings) * 1000:7.1f} ms  ({verdict})")
+
+
+async def main():
+    tenant_id, admin, manager = await seed()
+    await measure("admin (all users)", tenant_id, admin)
+    await measure(f"manager ({USERS} reports)", tenant_id, manager)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""Rows/second of the timesheet import: client side only, then end to end.
+
+The client-side pass parses, validates and builds COPY records without
+loading them; the end-to-end pass is a real import through COPY.
+
+Needs a scratch Postgres database: every table in it is dropped and recreated.
+
+    cd backend && BENCH_DATABASE_URL=postgresql://... python benchmarks/import_throughput.py 200000
+"""
+import asyncio
+import io
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+for name, value in {
+    "EMAIL_HOST": "localhost", "EMAIL_USER": "a@example.com", "EMAIL_PASSWORD": "x",
+    "jwt_secret_key": "x", "jwt_algorithm": "HS256", "jwt_expire_minutes": "60", "CACHE_BUS_BACKEND": "none",
+}.items():
+    os.environ.setdefault(name, value)
+
+from fastapi import UploadFile  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models import SCHEMA_UPGRADE_DDL, TASK_DURATION_DDL, Project, RoleEnum, Task, TaskTypeEnum, User, DepartmentEnum  # noqa: E402
+from app.services.import_service import TaskImporter, _csv_chunks, import_tasks  # noqa: E402
+from app.utils.tenancy import ensure_default_tenant  # noqa: E402
+
+USERS = 200
+PROJECTS = 40
+
+
+def make_csv(rows: int) -> bytes:
+    rng = random.Random(rows)
+    types = [t.value for t in TaskTypeEnum]
+    first = date(2024, 1, 1)
+    lines = ["employee_code,date,project,task_title,start_time,end_time,task_type,task_details"]
+    for _ in range(rows):
+        day = first + timedelta(days=rng.randrange(700))
+        start = rng.randrange(8, 17)
+        lines.append(
+            f"{rng.randrange(1, USERS + 1)},{day},P{rng.randrange(1, PROJECTS + 1)},Imported task,"
+            f"{day} {start:02d}:00,{day} {start + 1:02d}:30,{rng.choice(types)},Migrated from the legacy tool"
+        )
+    return ("\n".join(lines) + "\n").encode()
+
+
+async def main(rows: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for ddl in SCHEMA_UPGRADE_DDL + TASK_DURATION_DDL:
+            await conn.execute(ddl)
+    tenant_id = await ensure_default_tenant()
+
+    async with AsyncSessionLocal() as db:
+        db.info["tenant_id"] = tenant_id
+        db.add_all(
+            User(employee_code=i, name=f"User {i}", username=f"user{i}", email=f"user{i}@example.com", password="x",
+                 role=RoleEnum.Admin if i == 1 else RoleEnum.Employee, department=DepartmentEnum.IT)
+            for i in range(1, USERS + 1)
+        )
+        db.add_all(Project(project_code=f"P{i}", project_name=f"Project {i}") for i in range(1, PROJECTS + 1))
+        await db.commit()
+        admin = (await db.execute(select(User).where(User.employee_code == 1))).scalar_one()
+
+        payload = make_csv(rows)
+        importer = TaskImporter(db, admin, "Asia/Kolkata")
+        await importer.load_lookups()
+        started = time.perf_counter()
+        for df in _csv_chunks(UploadFile(io.BytesIO(payload), filename="tasks.csv"), settings.IMPORT_CHUNK_SIZE):
+            importer._records(importer._validate(df))
+        client = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = await import_tasks(UploadFile(io.BytesIO(payload), filename="tasks.csv"), "Asia/Kolkata", db, admin)
+        elapsed = time.perf_counter() - started
+        stored = (await db.execute(select(func.count()).select_from(Task))).scalar_one()
+
+    await engine.dispose()
+    print(f"client side: {rows / client:,.0f} rows/s")
+    print(f"end to end: {result['imported']} imported, {result['failed']} failed, {stored} stored in {elapsed:.2f}s: "
+          f"{result['imported'] / elapsed:,.0f} rows/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000))
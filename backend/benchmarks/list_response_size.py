@@ -0,0 +1,96 @@
+"""Bytes on the wire and server CPU for task list pages.
+
+Serialises pages of TaskOut rows the way FastAPI does, with all fields or with
+a typical `fields=` selection, and sends them through CompressionMiddleware
+with each Accept-Encoding. The database query is not included.
+
+    cd backend && python benchmarks/list_response_size.py
+"""
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, value in {
+    "DATABASE_URL": "postgresql://localhost/unused", "EMAIL_HOST": "localhost", "EMAIL_USER": "a@example.com",
+    "EMAIL_PASSWORD": "x", "jwt_secret_key": "x", "jwt_algorithm": "HS256", "jwt_expire_minutes": "60",
+    "CACHE_BUS_BACKEND": "none",
+}.items():
+    os.environ.setdefault(name, value)
+
+import httpx  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app import schemas  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.models import TaskTypeEnum, TaskStatusEnum  # noqa: E402
+from app.utils.compression import CompressionMiddleware  # noqa: E402
+
+PAGE_SIZES = [10, 100, 500]
+SELECTED = ["id", "task_title", "status", "start_time", "end_time"]
+ENCODINGS = ["identity", "gzip", "br"]
+WORDS = "review fix update client module report sprint deploy design api page login bug test build meeting".split()
+
+
+def make_rows(count: int) -> list:
+    rng = random.Random(count)
+    start = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+    rows = []
+    for i in range(count):
+        begin = start + timedelta(hours=i)
+        rows.append(schemas.TaskOut(
+            id=i + 1, user_id=rng.randint(1, 200), date=begin.date(), project_id=rng.randint(1, 40),
+            task_title=" ".join(rng.choices(WORDS, k=4))[:50],
+            task_details=" ".join(rng.choices(WORDS, k=60))[:256],
+            start_time=begin, end_time=begin + timedelta(minutes=rng.randint(10, 240)),
+            total_time_minutes=rng.randint(10, 240), task_type=rng.choice(list(TaskTypeEnum)),
+            reviewer_id=rng.randint(1, 20), status=TaskStatusEnum.Done, created_by=1,
+            project_name=f"Project {i % 40}", reviewer_name="Reviewer",
+        ))
+    return rows
+
+
+def build_app(pages: dict) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware, minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_COMPRESS_LEVEL, brotli_quality=settings.BROTLI_QUALITY,
+    )
+
+    @app.get("/tasks/{size}")
+    async def tasks(size: int, fields: str = ""):
+        rows = pages[size]
+        if fields:
+            names = fields.split(",")
+            return JSONResponse(jsonable_encoder([{n: getattr(row, n) for n in names} for row in rows]))
+        return JSONResponse(jsonable_encoder(rows))
+
+    return app
+
+
+async def main():
+    pages = {size: make_rows(size) for size in PAGE_SIZES}
+    transport = httpx.ASGITransport(app=build_app(pages))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'rows':>5} {'fields':>8} {'encoding':>9} {'bytes':>9} {'cpu ms':>8}")
+        for size in PAGE_SIZES:
+            for label, params in (("all", {}), ("5", {"fields": ",".join(SELECTED)})):
+                for encoding in ENCODINGS:
+                    headers = {"Accept-Encoding": encoding}
+                    response = await client.get(f"/tasks/{size}", params=params, headers=headers)
+                    assert response.headers.get("content-encoding", "identity") == encoding or response.num_bytes_downloaded < settings.COMPRESSION_MINIMUM_SIZE
+                    rounds = 50
+                    started = time.process_time()
+                    for _ in range(rounds):
+                        await client.get(f"/tasks/{size}", params=params, headers=headers)
+                    cpu = (time.process_time() - started) / rounds
+                    print(f"{size:>5} {label:>8} {encoding:>9} {response.num_bytes_downloaded:>9} {cpu * 1e3:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+"""Memory per idle live-feed connection and fan-out time per event.
+
+Opens N subscriptions with their stream() generators parked on the queue, as
+the /api/tasks/live endpoint does, and measures the Python heap they hold
+with tracemalloc. Socket and uvicorn per-connection buffers are not included.
+
+    cd backend && python benchmarks/live_feed_connections.py 1000 5000 20000
+"""
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for name, value in {
+    "DATABASE_URL": "postgresql://localhost/unused", "EMAIL_HOST": "localhost", "EMAIL_USER": "a@example.com",
+    "EMAIL_PASSWORD": "x", "jwt_secret_key": "x", "jwt_algorithm": "HS256", "jwt_expire_minutes": "60",
+    "CACHE_BUS_BACKEND": "none",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.models import Task, TaskStatusEnum  # noqa: E402
+from app.services.live_feed_service import ActiveTimerFeed, _entry  # noqa: E402
+
+TEAM_SIZE = 10
+
+
+async def run(connections: int):
+    feed = ActiveTimerFeed()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    streams = []
+    for i in range(connections):
+        # Each viewer watches their own team of TEAM_SIZE users.
+        team = list(range(i * TEAM_SIZE, (i + 1) * TEAM_SIZE))
+        stream = feed.stream(feed.subscribe(1, team))
+        await stream.__anext__()  # initial snapshot
+        streams.append(asyncio.ensure_future(stream.__anext__()))
+    await asyncio.sleep(0)
+
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    held = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+
+    task = Task(
+        id=1, tenant_id=1, user_id=0, project_id=1, task_title="Timer",
+        start_time=datetime.now(timezone.utc), status=TaskStatusEnum.InProgress,
+    )
+    started = time.perf_counter()
+    rounds = 1000
+    for i in range(rounds):
+        task.user_id = (i * TEAM_SIZE) % (connections * TEAM_SIZE)
+        # Moves the timer to the next team: one stop and one start event.
+        feed._start(_entry(task))
+    per_event = (time.perf_counter() - started) / rounds
+
+    started = time.perf_counter()
+    await feed.heartbeat()
+    heartbeat = time.perf_counter() - started
+
+    for future in streams:
+        future.cancel()
+    print(
+        f"{connections:>7} connections  {held / connections:8.0f} B/connection  {held / 2**20:7.1f} MiB  "
+        f"{per_event * 1e6:6.1f} µs/targeted event  {heartbeat * 1e3:7.2f} ms/heartbeat to all"
+    )
+
+
+if __name__ == "__main__":
+    for n in map(int, sys.argv[1:] or ["1000", "5000", "20000"]):
+        asyncio.run(run(n))
@@ -0,0 +1,98 @@
+"""Per-request cost of the list_tasks query with and without statement caching.
+
+Runs the paged list_tasks statement through a tenant session, as a request
+does, against a scratch Postgres database (every table in it is dropped and
+recreated):
+
+- rebuilt, no caches: a new select() per call; SQLAlchemy compiled cache and
+  asyncpg prepared-statement cache both disabled
+- rebuilt: a new select() per call with both caches on
+- cached: the lru_cached _task_query statement reused, both caches on
+
+    cd backend && BENCH_DATABASE_URL=postgresql://... python benchmarks/statement_cache.py
+"""
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["DATABASE_URL"] = os.environ["BENCH_DATABASE_URL"]
+for name, value in {
+    "EMAIL_HOST": "localhost", "EMAIL_USER": "a@example.com", "EMAIL_PASSWORD": "x",
+    "jwt_secret_key": "x", "jwt_algorithm": "HS256", "jwt_expire_minutes": "60", "CACHE_BUS_BACKEND": "none",
+}.items():
+    os.environ.setdefault(name, value)
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.database import DATABASE_URL, AsyncSessionLocal, Base, engine  # noqa: E402
+from app.models import TASK_DURATION_DDL, SCHEMA_UPGRADE_DDL, DepartmentEnum, Project, RoleEnum, Task, TaskStatusEnum, TaskTypeEnum, User  # noqa: E402
+from app.services.task_service import _task_query  # noqa: E402
+from app.utils.tenancy import ensure_default_tenant  # noqa: E402
+
+CALLS = 2000
+# A manager's filtered, paged list: scope + status + date range.
+SHAPE = (None, True, False, False, False, True, True, False, None, True)
+
+
+async def seed() -> int:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for ddl in SCHEMA_UPGRADE_DDL + TASK_DURATION_DDL:
+            await conn.execute(ddl)
+    tenant_id = await ensure_default_tenant()
+    async with AsyncSessionLocal() as db:
+        db.info["tenant_id"] = tenant_id
+        users = [User(employee_code=i, name=f"User {i}", username=f"user{i}", password="x",
+                      role=RoleEnum.Employee, department=DepartmentEnum.IT) for i in range(20)]
+        project = Project(project_code="P1", project_name="Project")
+        db.add_all(users + [project])
+        await db.flush()
+        start = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+        db.add_all(
+            Task(user_id=users[i % 20].id, project_id=project.id, task_title="Task", created_by=users[0].id,
+                 start_time=start + timedelta(hours=i), date=(start + timedelta(hours=i)).date(),
+                 task_type=TaskTypeEnum.Development, status=TaskStatusEnum.InProgress)
+            for i in range(2000)
+        )
+        await db.commit()
+        return tenant_id
+
+
+async def measure(label: str, sessionmaker, tenant_id: int, statement):
+    params = {
+        "scope_user_ids": list(range(1, 11)), "status": "InProgress",
+        "from_date": datetime(2026, 1, 1).date(), "to_date": datetime(2026, 6, 1).date(),
+        "offset": 0, "limit": 10,
+    }
+    async with sessionmaker() as db:
+        db.info["tenant_id"] = tenant_id
+        for _ in range(50):  # warm the connection and caches
+            rows = (await db.execute(statement(), params)).scalars().all()
+        assert len(rows) == params["limit"]
+        started = time.perf_counter()
+        for _ in range(CALLS):
+            (await db.execute(statement(), params)).scalars().all()
+        elapsed = time.perf_counter() - started
+    print(f"{label:<20} {elapsed / CALLS * 1e6:8.0f} µs/request")
+
+
+async def main():
+    tenant_id = await seed()
+    uncached_engine = create_async_engine(
+        DATABASE_URL, query_cache_size=0, connect_args={"prepared_statement_cache_size": 0},
+    )
+    uncached = async_sessionmaker(bind=uncached_engine, class_=AsyncSession, expire_on_commit=False)
+    rebuild = lambda: _task_query.__wrapped__(*SHAPE)  # noqa: E731
+    await measure("rebuilt, no caches", uncached, tenant_id, rebuild)
+    await measure("rebuilt", AsyncSessionLocal, tenant_id, rebuild)
+    await measure("cached", AsyncSessionLocal, tenant_id, lambda: _task_query(*SHAPE))
+    await uncached_engine.dispose()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
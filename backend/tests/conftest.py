@@ -0,0 +1,102 @@
+"""Shared fixtures.
+
+Tests that touch the database run against the Postgres named by
+TEST_DATABASE_URL (its tables are dropped and recreated) and are skipped when
+it is not set.
+"""
+import os
+from datetime import datetime, timezone
+from itertools import count
+
+# Settings are read at import time; these only need to be well-formed.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "postgresql://localhost/unused"
+os.environ.setdefault("EMAIL_HOST", "localhost")
+os.environ.setdefault("EMAIL_USER", "noreply@example.com")
+os.environ.setdefault("EMAIL_PASSWORD", "unused")
+os.environ.setdefault("jwt_secret_key", "test-secret")
+os.environ.setdefault("jwt_algorithm", "HS256")
+os.environ.setdefault("jwt_expire_minutes", "60")
+os.environ.setdefault("CACHE_BUS_BACKEND", "none")
+
+import pytest
+from sqlalchemy import text
+
+from app.database import Base, engine, AsyncSessionLocal
+from app.models import (
+    SCHEMA_UPGRADE_DDL, TASK_DURATION_DDL, User, Project, Task,
+    RoleEnum, DepartmentEnum, TaskTypeEnum, TaskStatusEnum,
+)
+from app.utils.cache import invalidation_bus
+from app.utils.tenancy import ensure_default_tenant
+
+
+@pytest.fixture(scope="session")
+async def schema():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        for ddl in SCHEMA_UPGRADE_DDL + TASK_DURATION_DDL:
+            await conn.execute(ddl)
+    yield
+    await engine.dispose()
+
+
+@pytest.fixture
+async def tenant_id(schema) -> int:
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+    # Drop users, tenants and hierarchies cached by earlier tests.
+    invalidation_bus.dispatch_all()
+    return await ensure_default_tenant()
+
+
+@pytest.fixture
+async def db(tenant_id):
+    async with AsyncSessionLocal() as session:
+        session.info["tenant_id"] = tenant_id
+        yield session
+
+
+class Factory:
+    """Inserts minimal valid rows through a tenant session."""
+
+    def __init__(self, db):
+        self.db = db
+        self._seq = count(1)
+
+    async def user(self, role: RoleEnum = RoleEnum.Employee, **values) -> User:
+        n = next(self._seq)
+        values.setdefault("department", DepartmentEnum.IT)
+        user = User(
+            employee_code=n, name=f"User {n}", username=f"user{n}", email=f"user{n}@example.com",
+            password="x", role=role, **values,
+        )
+        self.db.add(user)
+        await self.db.commit()
+        return user
+
+    async def project(self, **values) -> Project:
+        n = next(self._seq)
+        project = Project(project_code=f"P{n}", project_name=f"Project {n}", **values)
+        self.db.add(project)
+        await self.db.commit()
+        return project
+
+    async def task(self, user: User, project: Project, **values) -> Task:
+        values.setdefault("start_time", datetime(2026, 1, 5, 9, tzinfo=timezone.utc))
+        values.setdefault("date", values["start_time"].date())
+        values.setdefault("task_type", TaskTypeEnum.Development)
+        values.setdefault("status", TaskStatusEnum.InProgress)
+        task = Task(user_id=user.id, project_id=project.id, task_title="Task", created_by=user.id, **values)
+        self.db.add(task)
+        await self.db.commit()
+        return task
+
+
+@pytest.fixture
+def factory(db) -> Factory:
+    return Factory(db)
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.database import AsyncSessionLocal, engine
+from app.models import NotificationPreferenceEnum, RoleEnum, TaskStatusEnum, Tenant
+from app.services import auto_close_service, digest_service, task_service
+from app.services.audit_service import audit_log
+from app.utils.profiler import ProfileStore
+
+LAST_YEAR = datetime(2025, 3, 3, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def other_factory(db, factory):
+    """A factory writing into a second tenant."""
+    other = Tenant(slug="other", name="Other")
+    db.add(other)
+    await db.commit()
+    async with AsyncSessionLocal() as other_db:
+        other_db.info["tenant_id"] = other.id
+        yield type(factory)(other_db)
+
+
+async def test_admin_jobs_stay_in_one_tenant(db, factory, other_factory, tenant_id, monkeypatch):
+    for f in (factory, other_factory):
+        manager = await f.user(RoleEnum.Manager, notification_preference=NotificationPreferenceEnum.digest)
+        employee = await f.user(reporting_manager=manager.id)
+        project = await f.project()
+        await f.task(employee, project, start_time=LAST_YEAR)
+        await f.task(employee, project, status=TaskStatusEnum.ToBeApproved,
+                     start_time=LAST_YEAR, end_time=LAST_YEAR + timedelta(hours=1))
+    other_tenant_id = (await other_factory.user()).tenant_id
+
+    assert await auto_close_service.close_stale_tasks(tenant_id=tenant_id) == 1
+    await audit_log.flush()
+    async with AsyncSessionLocal() as check:
+        rows = (await check.execute(
+            text("SELECT tenant_id FROM tasks WHERE status = 'Done'")
+        )).scalars().all()
+    assert rows == [tenant_id]
+    assert auto_close_service.tenant_metrics(tenant_id).last_run_closed == 1
+    assert auto_close_service.tenant_metrics(other_tenant_id).last_run_closed == 0
+
+    # Drift every stored total behind the trigger's back.
+    async with engine.begin() as conn:
+        await conn.execute(text("SET LOCAL session_replication_role = replica"))
+        await conn.execute(text("UPDATE tasks SET total_time_minutes = 1 WHERE end_time IS NOT NULL"))
+    report = await task_service.verify_task_durations(repair=True, tenant_id=tenant_id)
+    assert (report["scanned"], report["repaired"]) == (2, 2)
+    async with AsyncSessionLocal() as check:
+        drifted = (await check.execute(
+            text("SELECT tenant_id FROM tasks WHERE total_time_minutes = 1")
+        )).scalars().all()
+    assert drifted == [other_tenant_id]
+
+    batches = []
+
+    async def send(messages):
+        batches.append(messages)
+        return len(messages)
+
+    monkeypatch.setattr(digest_service, "send_email_batch_async", send)
+    assert await digest_service.send_manager_digests(tenant_id=tenant_id) == 1
+    assert await digest_service.send_manager_digests() == 2
+
+
+def test_profiles_are_listed_per_tenant(tmp_path):
+    store = ProfileStore(str(tmp_path), max_files=10)
+    for profile_id, tenant_id in (("a", 1), ("b", 2), ("c", None)):
+        store.save({"id": profile_id, "tenant_id": tenant_id, "duration_ms": 1.0}, "report")
+
+    assert [r["id"] for r in store.slowest(10, 1)] == ["a"]
+    assert store.get("a", 1)["id"] == "a"
+    assert store.get("b", 1) is None
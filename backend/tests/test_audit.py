@@ -0,0 +1,43 @@
+from sqlalchemy import func, select
+
+from app.models import TaskAuditLog, TaskTombstone
+from app.services import task_service, user_service
+from app.services.audit_service import audit_log
+
+
+async def test_a_rejected_entry_does_not_block_the_buffer(db, factory, tenant_id):
+    user = await factory.user()
+    audit_log.record(tenant_id, 1, user.id, None, "create", {"status": [None, "Done"]})
+    # References a tenant that does not exist.
+    audit_log.record(tenant_id + 1, 2, user.id, None, "create", {"status": [None, "Done"]})
+    audit_log.record(tenant_id, 3, user.id, None, "create", {"status": [None, "Done"]})
+
+    assert await audit_log.flush() == 2
+    assert audit_log.pending(tenant_id + 1, 2) == []
+    count = await db.execute(select(func.count()).select_from(TaskAuditLog))
+    assert count.scalar_one() == 2
+
+
+async def test_history_includes_unflushed_entries(db, factory, tenant_id):
+    user = await factory.user()
+    task = await factory.task(user, await factory.project())
+    audit_log.record(tenant_id, task.id, user.id, user.id, "create", {"status": [None, "In Progress"]})
+    await audit_log.flush()
+    audit_log.record(tenant_id, task.id, user.id, user.id, "complete", {"status": ["In Progress", "Done"]})
+
+    history = await task_service.get_task_history(task.id, db, user)
+    assert [(e.id is not None, e.action) for e in history] == [(True, "create"), (False, "complete")]
+    await audit_log.flush()
+
+
+async def test_users_with_history_can_be_deleted(db, factory, tenant_id):
+    user = await factory.user()
+    task = await factory.task(user, await factory.project())
+    audit_log.record(tenant_id, task.id, user.id, user.id, "create", {"status": [None, "In Progress"]})
+    await task_service.delete_task(task.id, db, user)
+
+    await user_service.delete_user(user.id, db)
+    # The create and delete entries, buffered for a user that is now gone.
+    assert await audit_log.flush() == 2
+    tombstones = await db.execute(select(func.count()).select_from(TaskTombstone))
+    assert tombstones.scalar_one() == 1
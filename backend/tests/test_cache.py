@@ -0,0 +1,87 @@
+import asyncio
+import multiprocessing
+import time
+
+from app.utils.cache import ALL, Cache, InvalidationBus, SQLiteInvalidationBus
+
+WORKERS = 4
+POLL_SECONDS = 0.01
+
+
+def test_set_after_invalidation_is_dropped():
+    cache = Cache("users", InvalidationBus(), ttl_seconds=60, max_entries=2)
+    version = cache.version()
+    cache._evict("1")
+    cache.set("1", "stale", version)
+    assert cache.get("1") is None
+
+    # Other keys, and loads started after the invalidation, are cached.
+    cache.set("2", "fresh", version)
+    cache.set("1", "fresh", cache.version())
+    assert (cache.get("1"), cache.get("2")) == ("fresh", "fresh")
+
+
+def test_forgotten_invalidations_still_drop_older_sets():
+    cache = Cache("users", InvalidationBus(), ttl_seconds=60, max_entries=2)
+    version = cache.version()
+    for key in ("1", "2", "3"):
+        cache._evict(key)
+    cache.set("1", "stale", version)
+    assert cache.get("1") is None
+
+    version = cache.version()
+    cache._evict(ALL)
+    cache.set("4", "stale", version)
+    assert cache.get("4") is None
+
+
+def _worker(path: str, ready, results):
+    async def main():
+        bus = SQLiteInvalidationBus(path, POLL_SECONDS)
+        cache = Cache("users", bus, ttl_seconds=60, max_entries=10)
+        cache.set("1", "cached")
+        await bus.start()
+        # A load of user 1 is in flight when the invalidation arrives.
+        version = cache.version()
+        ready.put(True)
+        deadline = time.time() + 10
+        while cache.get("1") is not None and time.time() < deadline:
+            await asyncio.sleep(POLL_SECONDS / 4)
+        evicted_at = time.time()
+        cache.set("1", "loaded before the write", version)
+        results.put((evicted_at, cache.get("1")))
+        await bus.stop()
+
+    asyncio.run(main())
+
+
+def test_invalidation_reaches_every_process(tmp_path):
+    path = str(tmp_path / "bus.sqlite")
+    context = multiprocessing.get_context("spawn")
+    ready, results = context.Queue(), context.Queue()
+    workers = [context.Process(target=_worker, args=(path, ready, results)) for _ in range(WORKERS)]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in workers:
+            ready.get(timeout=30)
+
+        async def publish():
+            bus = SQLiteInvalidationBus(path, POLL_SECONDS)
+            await bus.start()
+            await bus.stop()
+            published_at = time.time()
+            await bus.publish("users", "1")
+            return published_at
+
+        published_at = asyncio.run(publish())
+        outcomes = [results.get(timeout=30) for _ in workers]
+    finally:
+        for worker in workers:
+            worker.join(timeout=10)
+
+    assert [value for _, value in outcomes] == [None] * WORKERS
+    latencies = sorted(evicted_at - published_at for evicted_at, _ in outcomes)
+    print(f"invalidation latency over {WORKERS} processes: max {latencies[-1] * 1000:.1f} ms")
+    # A few poll intervals plus scheduling noise.
+    assert latencies[-1] < 1.0
@@ -0,0 +1,24 @@
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+
+from app.models import DepartmentEnum, DepartmentWorkingHours, RoleEnum
+from app.schemas import WorkingHoursUpdate
+from app.services.calendar_service import hours_report
+
+
+def test_weekmask_needs_a_working_day():
+    assert WorkingHoursUpdate(weekmask="0000010").weekmask == "0000010"
+    with pytest.raises(ValidationError, match="at least one working day"):
+        WorkingHoursUpdate(weekmask="0000000")
+
+
+async def test_hours_report_survives_stored_mask_without_working_days(db, factory):
+    admin = await factory.user(RoleEnum.Admin, department=DepartmentEnum.IT)
+    db.add(DepartmentWorkingHours(department=DepartmentEnum.IT, weekmask="0000000", minutes_per_day=480))
+    await db.commit()
+
+    report = await hours_report(date(2026, 1, 5), date(2026, 1, 11), db, admin)
+
+    assert [(u["user_id"], u["expected_minutes"]) for u in report["users"]] == [(admin.id, 0)]
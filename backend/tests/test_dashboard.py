@@ -0,0 +1,88 @@
+import asyncio
+import os
+from datetime import date, datetime, timedelta, timezone
+
+from app.models import DepartmentEnum
+from app.schemas import UserUpdate
+from app.services import task_service, user_service
+from app.services.audit_service import audit_log, diff, snapshot
+from app.services.dashboard_service import DEPARTMENT_INDEX, DashboardCube, dashboard_cube
+
+MONDAY = date(2026, 1, 5)
+
+
+def _minutes_per_week(cube: DashboardCube, tenant_id: int, department=DepartmentEnum.IT) -> list:
+    heatmap = cube.heatmap(tenant_id, MONDAY, MONDAY + timedelta(weeks=2))
+    return [sum(week) for week in heatmap["minutes"][DEPARTMENT_INDEX[department]]]
+
+
+async def _logged(factory, user, project, day: date, minutes: int):
+    start = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc) + timedelta(hours=9)
+    return await factory.task(user, project, start_time=start, end_time=start + timedelta(minutes=minutes))
+
+
+async def test_update_recomputes_weeks_touched_by_edits_and_deletes(db, factory, tenant_id, tmp_path):
+    user = await factory.user()
+    project = await factory.project()
+    moved = await _logged(factory, user, project, MONDAY, 60)
+    await _logged(factory, user, project, MONDAY + timedelta(days=1), 30)
+    deleted = await _logged(factory, user, project, MONDAY + timedelta(weeks=1), 45)
+
+    cube = DashboardCube(str(tmp_path / "cube.npz"))
+    assert await cube.update()
+    assert _minutes_per_week(cube, tenant_id) == [90, 45, 0]
+
+    # Only the audit log still knows the moved task's old week.
+    await db.refresh(moved)
+    before = snapshot(moved)
+    moved.date = MONDAY + timedelta(weeks=2)
+    await db.commit()
+    await db.refresh(moved)
+    audit_log.record(tenant_id, moved.id, user.id, user.id, "edit", diff(before, snapshot(moved)))
+    await audit_log.flush()
+    # Only the tombstone still knows the deleted task's week.
+    await task_service.delete_task(deleted.id, db, user)
+
+    assert await cube.update()
+    assert _minutes_per_week(cube, tenant_id) == [30, 0, 60]
+
+    restarted = DashboardCube(cube.snapshot_path)
+    await restarted.reload()
+    assert _minutes_per_week(restarted, tenant_id) == [30, 0, 60]
+    assert os.listdir(tmp_path) == ["cube.npz"]
+
+
+async def test_one_worker_refreshes_per_interval(db, factory, tenant_id, tmp_path):
+    await _logged(factory, await factory.user(), await factory.project(), MONDAY, 60)
+    workers = [DashboardCube(str(tmp_path / "cube.npz")) for _ in range(3)]
+
+    await asyncio.gather(*(worker.refresh() for worker in workers))
+
+    assert sum(worker.built_at is not None for worker in workers) == 1
+    # The others pick the result up from the shared snapshot.
+    for worker in workers:
+        await worker.reload()
+    assert [_minutes_per_week(worker, tenant_id) for worker in workers] == [[60, 0, 0]] * 3
+
+
+async def test_department_moves_recompute_only_that_users_weeks(db, factory, tenant_id, tmp_path):
+    project = await factory.project()
+    mover, stayer = await factory.user(), await factory.user()
+    await _logged(factory, mover, project, MONDAY, 60)
+    await _logged(factory, mover, project, MONDAY + timedelta(weeks=2), 30)
+    await _logged(factory, stayer, project, MONDAY + timedelta(weeks=1), 45)
+    cube = DashboardCube(str(tmp_path / "cube.npz"))
+    await cube.update()
+    built_at = cube.built_at
+    dashboard_cube.moved_users.clear()
+
+    await user_service.update_user(stayer.id, UserUpdate.model_construct(name="Renamed"), db)
+    await user_service.update_user(mover.id, UserUpdate.model_construct(department=DepartmentEnum.QA), db)
+    assert list(dashboard_cube.moved_users) == [mover.id]
+    cube.user_moved(str(mover.id))
+
+    assert await cube.update()
+    assert cube.built_at == built_at
+    assert _minutes_per_week(cube, tenant_id) == [0, 45, 0]
+    assert _minutes_per_week(cube, tenant_id, DepartmentEnum.QA) == [60, 0, 30]
+    assert cube.moved_users == {}
@@ -0,0 +1,24 @@
+import asyncio
+
+from app.models import RoleEnum, TaskStatusEnum, NotificationPreferenceEnum
+from app.services import digest_service
+
+
+async def test_each_digest_slot_is_sent_by_one_worker(db, factory, monkeypatch):
+    batches = []
+
+    async def send(messages):
+        batches.append(messages)
+        return len(messages)
+
+    monkeypatch.setattr(digest_service, "send_email_batch_async", send)
+    manager = await factory.user(RoleEnum.Manager, notification_preference=NotificationPreferenceEnum.digest)
+    employee = await factory.user(reporting_manager=manager.id)
+    await factory.task(employee, await factory.project(), status=TaskStatusEnum.ToBeApproved)
+
+    # Three workers wake up for the same slot.
+    sent = await asyncio.gather(*(digest_service.run_scheduled_digest() for _ in range(3)))
+
+    assert sorted(sent) == [0, 0, 1]
+    assert [[email for _, email, _ in batch] for batch in batches] == [[manager.email]]
+    assert await digest_service.run_scheduled_digest() == 0
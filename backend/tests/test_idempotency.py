@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from app.utils.idempotency import IdempotencyStore
+
+
+class Out(BaseModel):
+    n: int
+
+
+async def test_each_key_runs_once_across_workers(tenant_id):
+    # One store per worker; they share only the database.
+    workers = [IdempotencyStore(ttl_seconds=60, lock_seconds=10) for _ in range(3)]
+    calls = []
+
+    async def func():
+        calls.append(1)
+        await asyncio.sleep(0.2)
+        return Out(n=len(calls))
+
+    results = await asyncio.gather(*(w.run(tenant_id, "create", "k1", "fp", func) for w in workers))
+
+    assert calls == [1]
+    # The original gets the model back, the duplicates a replayed response.
+    assert [r.n for r in results if isinstance(r, Out)] == [1]
+    assert [r.body for r in results if not isinstance(r, Out)] == [b'{"n":1}'] * 2
+    with pytest.raises(HTTPException) as error:
+        await workers[0].run(tenant_id, "create", "k1", "other", func)
+    assert error.value.status_code == 422
+    # Keys are per endpoint.
+    await workers[0].run(tenant_id, "complete:1", "k1", "fp", func)
+    assert calls == [1, 1]
+
+
+async def test_failed_requests_release_their_key(tenant_id):
+    store = IdempotencyStore(ttl_seconds=60, lock_seconds=10)
+    calls = []
+
+    async def fail():
+        raise HTTPException(status_code=503, detail="down")
+
+    async def succeed():
+        return Out(n=1)
+
+    async def reject():
+        calls.append(1)
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    with pytest.raises(HTTPException):
+        await store.run(tenant_id, "approve:1", "k", "fp", fail)
+    assert (await store.run(tenant_id, "approve:1", "k", "fp", succeed)).n == 1
+
+    # 4xx answers are final: the retry replays them without running again.
+    for _ in range(2):
+        with pytest.raises(HTTPException) as error:
+            await store.run(tenant_id, "approve:2", "k", "fp", reject)
+        assert (error.value.status_code, error.value.detail) == (404, "Task not found")
+    assert calls == [1]
@@ -0,0 +1,49 @@
+import io
+from datetime import date
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import select
+
+from app.models import RoleEnum, Task, User
+from app.services.import_service import _parse_times, import_tasks
+
+
+def test_time_only_values_fall_on_the_row_date():
+    dates = pd.Series([date(2025, 3, 4), date(2025, 3, 5)])
+    parsed = _parse_times(pd.Series(["09:30", "17:15:00"]), dates, "Asia/Kolkata")
+    assert [t.isoformat() for t in parsed] == ["2025-03-04T04:00:00+00:00", "2025-03-05T11:45:00+00:00"]
+
+
+def test_full_timestamps_ignore_the_row_date():
+    dates = pd.Series([date(2025, 3, 4)])
+    parsed = _parse_times(pd.Series(["2025-03-01 09:30"]), dates, "UTC")
+    assert parsed[0].isoformat() == "2025-03-01T09:30:00+00:00"
+
+
+async def test_rejects_unknown_timezone():
+    upload = UploadFile(io.BytesIO(b"employee_code\n"), filename="tasks.csv")
+    with pytest.raises(HTTPException) as exc:
+        await import_tasks(upload, "Mars/Olympus", None, User(id=1, tenant_id=1))
+    assert exc.value.status_code == 400
+
+
+async def test_imports_rows_with_time_only_cells(db, factory):
+    admin = await factory.user(RoleEnum.Admin)
+    reviewer = await factory.user(RoleEnum.TL)
+    project = await factory.project()
+    csv = (
+        "employee_code,date,project,task_title,start_time,end_time,task_type,reviewer_employee_code\n"
+        f"{admin.employee_code},2025-03-04,{project.project_code},Imported,09:30,17:00,Development,{reviewer.employee_code}\n"
+        f"{admin.employee_code},2025-03-05,nope,Bad project,09:30,17:00,Development,\n"
+    ).encode()
+
+    result = await import_tasks(UploadFile(io.BytesIO(csv), filename="tasks.csv"), "Asia/Kolkata", db, admin)
+
+    assert (result["imported"], result["failed"]) == (1, 1)
+    assert result["errors"] == [{"row": 3, "errors": ["Unknown project"]}]
+    task = (await db.execute(select(Task))).scalar_one()
+    assert task.start_time.isoformat() == "2025-03-04T04:00:00+00:00"
+    assert task.end_time.isoformat() == "2025-03-04T11:30:00+00:00"
+    assert (task.reviewer_id, task.total_time_minutes, task.is_backdated) == (reviewer.id, 450, True)
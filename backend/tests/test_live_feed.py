@@ -0,0 +1,36 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+
+from app.models import Task, TaskStatusEnum
+from app.services.live_feed_service import ActiveTimerFeed
+from app.utils.cache import invalidation_bus
+
+
+async def test_changes_reach_subscribers_in_other_workers(monkeypatch):
+    sent = []
+
+    async def send(payload):
+        sent.append(json.loads(payload))
+
+    monkeypatch.setattr(invalidation_bus, "_send", send)
+    worker_a, worker_b = ActiveTimerFeed(), ActiveTimerFeed()
+    manager = worker_b.subscribe(tenant_id=1, user_ids=[7])
+
+    task = Task(
+        id=1, tenant_id=1, user_id=7, project_id=1, task_title="Timer",
+        start_time=datetime(2026, 1, 5, 9, tzinfo=timezone.utc), status=TaskStatusEnum.InProgress,
+    )
+    worker_a.publish_task(task)
+    task.end_time = datetime(2026, 1, 5, 10, tzinfo=timezone.utc)
+    task.status = TaskStatusEnum.Done
+    worker_a.publish_task(task)
+    await asyncio.sleep(0)
+
+    assert [m["n"] for m in sent] == ["live_feed", "live_feed"]
+    for message in sent:
+        worker_b.receive(message["k"])
+
+    assert manager.queue.get_nowait().startswith("event: start")
+    assert manager.queue.get_nowait() == 'event: stop\ndata: {"id":1}\n\n'
+    assert worker_b.active == {}
@@ -0,0 +1,33 @@
+import asyncio
+import json
+
+from app.models import RoleEnum, TaskStatusEnum
+from app.services.reviewer_service import ReviewerLoadBalancer
+from app.utils.cache import invalidation_bus
+
+
+async def test_load_changes_reach_other_workers(db, factory, monkeypatch):
+    sent = []
+
+    async def send(payload):
+        sent.append(json.loads(payload))
+
+    monkeypatch.setattr(invalidation_bus, "_send", send)
+    manager = await factory.user(RoleEnum.Manager)
+    tl = await factory.user(RoleEnum.TL, reporting_manager=manager.id)
+    employee = await factory.user(reporting_manager=manager.id)
+
+    worker_a, worker_b = ReviewerLoadBalancer(), ReviewerLoadBalancer()
+    await worker_a.resync()
+    await worker_b.resync()
+    assert worker_b.pick(manager.id, employee.id) == manager.id
+
+    # Worker A assigns a review to the manager; worker B must now prefer the TL.
+    worker_a.task_changed(None, {"reviewer_id": manager.id, "status": TaskStatusEnum.ToBeApproved})
+    await asyncio.sleep(0)
+    for message in sent:
+        assert message["n"] == "reviewer_load"
+        worker_b.receive(message["k"])
+
+    assert worker_b.load == {manager.id: 1}
+    assert worker_b.pick(manager.id, employee.id) == tl.id
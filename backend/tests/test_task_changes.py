@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import RoleEnum
+from app.services.task_service import delete_task, get_task_changes
+
+
+async def read_all(db, user, since, limit):
+    pages = [await get_task_changes(since, db, user, limit)]
+    while pages[-1]["has_more"]:
+        assert len(pages) < 20, "paging did not terminate"
+        pages.append(await get_task_changes(None, db, user, limit, pages[-1]["next_cursor"]))
+    return pages
+
+
+async def test_full_resync_pages_through_old_tasks(db, factory):
+    admin = await factory.user(RoleEnum.Admin)
+    project = await factory.project()
+    old = datetime.now(timezone.utc) - timedelta(days=90)
+    tasks = [await factory.task(admin, project, updated_at=old + timedelta(minutes=i)) for i in range(5)]
+
+    for since in (None, old - timedelta(days=1)):
+        pages = await read_all(db, admin, since, limit=2)
+        assert [len(p["tasks"]) for p in pages] == [2, 2, 1]
+        assert all(p["full_resync"] for p in pages)
+        assert [t.id for p in pages for t in p["tasks"]] == [t.id for t in tasks]
+
+
+async def test_pages_through_tasks_sharing_one_updated_at(db, factory):
+    admin = await factory.user(RoleEnum.Admin)
+    project = await factory.project()
+    stamp = datetime.now(timezone.utc) - timedelta(minutes=1)
+    tasks = [await factory.task(admin, project, updated_at=stamp) for _ in range(5)]
+    await factory.task(admin, project, updated_at=stamp - timedelta(hours=1))
+
+    pages = await read_all(db, admin, stamp - timedelta(seconds=1), limit=2)
+    assert [t.id for p in pages for t in p["tasks"]] == [t.id for t in tasks]
+    assert not any(p["full_resync"] for p in pages)
+    # The watermark comes from the first page's start, not from the rows.
+    assert len({p["watermark"] for p in pages}) == 1
+
+
+async def test_deleted_ids_are_reported_on_the_first_page_only(db, factory):
+    admin = await factory.user(RoleEnum.Admin)
+    project = await factory.project()
+    since = datetime.now(timezone.utc) - timedelta(minutes=1)
+    for _ in range(3):
+        await factory.task(admin, project)
+    doomed = await factory.task(admin, project)
+    await delete_task(doomed.id, db, admin)
+
+    pages = await read_all(db, admin, since, limit=2)
+    assert [p["deleted_ids"] for p in pages] == [[doomed.id], []]
+
+
+async def test_rejects_malformed_cursor(db, factory):
+    admin = await factory.user(RoleEnum.Admin)
+    with pytest.raises(HTTPException) as exc:
+        await get_task_changes(None, db, admin, 10, "not-a-cursor")
+    assert exc.value.status_code == 400
@@ -0,0 +1,17 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.services import task_service
+
+START = datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+
+
+async def test_each_duration_check_slot_is_run_by_one_worker(db, factory, tenant_id):
+    await factory.task(await factory.user(), await factory.project(), start_time=START, end_time=START + timedelta(hours=1))
+
+    # Three workers wake up for the same interval.
+    reports = await asyncio.gather(*(task_service.run_scheduled_duration_check() for _ in range(3)))
+
+    assert sorted(r["scanned"] for r in reports if r is not None) == [1]
+    assert reports.count(None) == 2
+    assert await task_service.run_scheduled_duration_check() is None
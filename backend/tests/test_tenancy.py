@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy import lambda_stmt, select, text
+from starlette.requests import Request
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.dependencies import get_current_user
+from app.models import Tenant, User, tenant_upgrade_ddl
+from app.services import project_service, task_service, user_service
+from app.utils.auth import create_access_token
+from app.utils.tenancy import tenant_from_request
+
+
+async def test_repeated_lookups_by_id_return_each_row(db, factory):
+    users = [await factory.user() for _ in range(3)]
+    projects = [await factory.project() for _ in range(2)]
+    tasks = [await factory.task(users[0], projects[0]) for _ in range(2)]
+
+    assert [(await user_service.get_user_by_id(u.id, db)).id for u in users] == [u.id for u in users]
+    assert [(await project_service.get_project_by_id(p.id, db)).id for p in projects] == [p.id for p in projects]
+    end = datetime(2026, 1, 5, 10, tzinfo=timezone.utc)
+    assert [(await task_service.complete_task(t.id, end, db)).id for t in tasks] == [t.id for t in tasks]
+    current = [await get_current_user(create_access_token(u), db) for u in users]
+    assert [u.id for u in current] == [u.id for u in users]
+
+
+async def test_lookups_by_id_stay_in_the_session_tenant(db, factory):
+    other = Tenant(slug="other", name="Other")
+    db.add(other)
+    await db.commit()
+    async with AsyncSessionLocal() as other_db:
+        other_db.info["tenant_id"] = other.id
+        outsider = await type(factory)(other_db).user()
+
+    await factory.user()
+    with pytest.raises(HTTPException) as error:
+        await user_service.get_user_by_id(outsider.id, db)
+    assert error.value.status_code == 404
+
+
+async def test_lambda_statements_are_refused_in_tenant_sessions(db):
+    with pytest.raises(TypeError):
+        await db.execute(lambda_stmt(lambda: select(User)))
+
+
+def _request(authorization=None) -> Request:
+    headers = [(b"authorization", authorization.encode())] if authorization else []
+    return Request({"type": "http", "headers": headers})
+
+
+def test_requests_without_a_tenant_are_rejected():
+    signed = lambda claims: jwt.encode(claims, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)  # noqa: E731
+    assert tenant_from_request(_request(f"Bearer {signed({'sub': '1', 'tid': 7})}")) == 7
+    for authorization in (None, "Basic abc", "Bearer not-a-token", f"Bearer {signed({'sub': '1'})}"):
+        with pytest.raises(HTTPException) as error:
+            tenant_from_request(_request(authorization))
+        assert error.value.status_code == 401
+
+
+SCHEMA_SNAPSHOT = """
+SELECT indexdef FROM pg_indexes WHERE tablename IN ('users', 'projects', 'tasks')
+UNION ALL
+SELECT conrelid::regclass || ' ' || pg_get_constraintdef(oid) FROM pg_constraint
+WHERE conrelid IN ('users'::regclass, 'projects'::regclass, 'tasks'::regclass)
+"""
+
+# The single-tenant schema these tables had before tenant_id existed.
+PRE_TENANT_DDL = [
+    "ALTER TABLE users DROP COLUMN tenant_id CASCADE",
+    "ALTER TABLE projects DROP COLUMN tenant_id CASCADE",
+    "ALTER TABLE tasks DROP COLUMN tenant_id CASCADE",
+    "DROP INDEX ix_users_employee_code",
+    "CREATE UNIQUE INDEX ix_users_employee_code ON users (employee_code)",
+    "DROP INDEX ix_users_email",
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    "ALTER TABLE users ADD CONSTRAINT users_username_key UNIQUE (username)",
+    "ALTER TABLE projects ADD CONSTRAINT projects_project_code_key UNIQUE (project_code)",
+    "CREATE INDEX ix_tasks_user_id_updated_at ON tasks (user_id, updated_at)",
+]
+
+
+async def test_upgrade_moves_pre_tenant_rows_to_the_default_tenant(db, factory, tenant_id):
+    user = await factory.user()
+    await factory.task(user, await factory.project())
+
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            expected = sorted((await conn.execute(text(SCHEMA_SNAPSHOT))).scalars())
+            for statement in PRE_TENANT_DDL:
+                await conn.execute(text(statement))
+            # Twice: the second run must be a no-op.
+            for _ in range(2):
+                for ddl in tenant_upgrade_ddl(tenant_id):
+                    await conn.execute(ddl)
+
+            for table in ("users", "projects", "tasks"):
+                assert (await conn.execute(text(f"SELECT DISTINCT tenant_id FROM {table}"))).scalars().all() == [tenant_id]
+            assert sorted((await conn.execute(text(SCHEMA_SNAPSHOT))).scalars()) == expected
+        finally:
+            await transaction.rollback()
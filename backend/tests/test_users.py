@@ -0,0 +1,42 @@
+from app.models import RoleEnum
+from app.schemas import UserUpdate
+from app.services import user_service
+from app.services.user_service import hierarchy_cache
+from app.utils.cache import invalidation_bus
+
+
+def _fill(keys):
+    for key in keys:
+        hierarchy_cache.set(key, [0])
+
+
+def _cached(keys):
+    return {key for key in keys if hierarchy_cache.get(key) is not None}
+
+
+async def test_user_writes_evict_only_affected_team_lists(db, factory, monkeypatch):
+    old_tl = await factory.user(RoleEnum.TL)
+    new_tl = await factory.user(RoleEnum.TL)
+    manager = await factory.user(RoleEnum.Manager)
+    user = await factory.user(tl=old_tl.id, reporting_manager=manager.id)
+    keys = {f"TL:{old_tl.id}", f"TL:{new_tl.id}", f"Manager:{manager.id}", f"Employee:{user.id}"}
+    teams = []
+    monkeypatch.setattr(invalidation_bus, "publish",
+                        _recording(invalidation_bus.publish, teams))
+
+    _fill(keys)
+    await user_service.update_user(user.id, UserUpdate.model_construct(name="Renamed", password="secret1"), db)
+    assert _cached(keys) == keys
+    assert teams == []
+
+    await user_service.update_user(user.id, UserUpdate.model_construct(tl=new_tl.id), db)
+    assert _cached(keys) == {f"Manager:{manager.id}", f"Employee:{user.id}"}
+    assert teams == [user.id]
+
+
+def _recording(publish, teams):
+    async def recording(namespace, key="*", local=True):
+        if namespace == "teams":
+            teams.append(key)
+        await publish(namespace, key, local)
+    return recording